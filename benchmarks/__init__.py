@@ -0,0 +1,4 @@
+"""
+Performance benchmarks. Run from the project directory, e.g.:
+$ python -m benchmarks.bench_group_by_age
+"""
@@ -0,0 +1,48 @@
+"""
+Throughput (tasks/sec) of executing many tasks in one process with the
+BatchRunner, compared with running each task in a new process.
+$ python -m benchmarks.bench_batch_runner --tasks 200
+"""
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+from benchmarks.bench_query_server import measure_latency, CLI_CALL
+from benchmarks.common import temporary_database_url, create_data_manager, \
+    ADMIN_EMAIL, ADMIN_PASSWORD
+from modules.batch_runner import BatchRunner
+from script import match_task
+
+TASKS = ("print-children", "print-all-accounts", "print-oldest-account")
+
+
+def main(args):
+    requests = [
+        (line_number, {"task": TASKS[line_number % len(TASKS)],
+                       "login": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+        for line_number in range(1, args.tasks + 1)]
+    with temporary_database_url() as database_url:
+        data_manager = create_data_manager(database_url, args.users)
+        data_manager.log_out()
+        start_time = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), \
+                contextlib.redirect_stderr(io.StringIO()):
+            BatchRunner(data_manager, match_task).run(requests)
+        batch_rate = args.tasks / (time.perf_counter() - start_time)
+
+        process_latency = measure_latency(
+            [sys.executable, "-c", CLI_CALL, database_url, TASKS[0],
+             ADMIN_EMAIL, ADMIN_PASSWORD], args.calls)
+        data_manager.engine.dispose()
+    print(f"new process per task: {1 / process_latency:.1f} tasks/s, "
+          f"batch: {batch_rate:.1f} tasks/s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--users", type=int, default=10000)
+    main(parser.parse_args())
@@ -0,0 +1,42 @@
+"""
+Compares the number of accounts counted by a database query
+(DataManager) with the number read from the columnar snapshot (requires
+numpy).
+$ python -m benchmarks.bench_columnar --children 10000000
+"""
+import argparse
+
+from benchmarks.common import timer, temporary_database_url, \
+    create_data_manager
+from database.columnar import ColumnarSnapshot
+
+
+def compare_reports(data_manager, snapshot, calls):
+    with timer(f"accounts_total_number x {calls}, database queries"):
+        for _ in range(calls):
+            expected = data_manager.accounts_total_number()
+    with timer(f"accounts_total_number x {calls}, columnar snapshot"):
+        for _ in range(calls):
+            result = snapshot.accounts_total_number()
+    assert result == expected, "results differ"
+
+
+def main(args):
+    users_number = args.children // args.children_per_user
+    with temporary_database_url() as database_url:
+        with timer(f"populating database ({args.children} children)"):
+            data_manager = create_data_manager(
+                database_url, users_number, args.children_per_user)
+
+        with timer("loading columnar snapshot"):
+            snapshot = ColumnarSnapshot.load(data_manager.session)
+        compare_reports(data_manager, snapshot, args.calls)
+        data_manager.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--children", type=int, default=10000000)
+    parser.add_argument("--children-per-user", type=int, default=2)
+    parser.add_argument("--calls", type=int, default=10)
+    main(parser.parse_args())
@@ -0,0 +1,89 @@
+"""
+Compares the printers of modules.data_printer (writing through
+OutputWriter) with the former print-per-fragment implementations,
+checking that the output is identical.
+$ python -m benchmarks.bench_data_printer --parents 100000
+"""
+import argparse
+import io
+import os
+from contextlib import redirect_stdout
+
+from benchmarks.common import timer
+from modules.data_printer import print_children, \
+    print_users_children_same_age
+
+
+class Record:
+    def __init__(self, text):
+        self.text = text
+
+    def __str__(self):
+        return self.text
+
+
+def print_children_per_fragment(children):
+    for child in children:
+        print(f"{child}")
+
+
+def print_users_children_same_age_per_fragment(data):
+    def _print_children(_children):
+        for i in range(len(_children)):
+            print(f"{str(_children[i])}", end="")
+            (i == len(_children) - 1) or print("; ", end="")
+
+    parents = data.keys()
+    for key in parents:
+        print(f"{str(key)}: ", end="")
+        children = data[key]
+        _print_children(children)
+        print()
+
+
+def get_output(print_function, data):
+    buffer = io.BytesIO()
+    stream = io.TextIOWrapper(buffer, encoding="utf-8")
+    with redirect_stdout(stream):
+        print_function(data)
+    stream.flush()
+    return buffer.getvalue()
+
+
+def compare(label, former_function, print_function, data, printed_data=None):
+    """
+    :param printed_data: data passed to 'print_function', if other than
+    passed to 'former_function'
+    """
+    printed_data = data if printed_data is None else printed_data
+    assert get_output(former_function, data) \
+           == get_output(print_function, printed_data), "outputs differ"
+    for function_label, function, function_data in (
+            ("print per fragment", former_function, data),
+            ("OutputWriter", print_function, printed_data)):
+        with timer(f"{label}, {function_label}"):
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                function(function_data)
+
+
+def main(args):
+    children = [Record(f"Child{i}, {i % 18}")
+                for i in range(args.parents * args.children_per_parent)]
+    parents_children = {
+        Record(f"Parent{i}, {100000000 + i}"): children[
+            i * args.children_per_parent:(i + 1) * args.children_per_parent]
+        for i in range(args.parents)
+    }
+    compare(f"print_children ({len(children)} children)",
+            print_children_per_fragment, print_children, children)
+    compare(f"print_users_children_same_age ({args.parents} parents)",
+            print_users_children_same_age_per_fragment,
+            print_users_children_same_age, parents_children,
+            list(parents_children.items()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parents", type=int, default=100000)
+    parser.add_argument("--children-per-parent", type=int, default=5)
+    main(parser.parse_args())
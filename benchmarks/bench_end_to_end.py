@@ -0,0 +1,68 @@
+"""
+End-to-end times of create_database and of every task for generated
+datasets (see: benchmarks.dataset) of growing size, with the same
+profiles and batch size as the script.
+$ python -m benchmarks.bench_end_to_end --users 10000 100000 1000000 \
+    --duplicate-emails 0.01 --duplicate-phones 0.01 --phone-noise 0.2
+"""
+import argparse
+import os
+import tempfile
+from contextlib import redirect_stdout
+
+from benchmarks.common import timer, temporary_database_url, \
+    ADMIN_EMAIL, ADMIN_PASSWORD
+from benchmarks.dataset import write_dataset, add_generator_arguments, \
+    generator_options
+from database.data_manager import DataManager
+from modules.serializers import FORMATS
+from script import match_task, get_profile, IMPORT_BATCH_SIZE
+
+TASKS = ("print-all-accounts", "print-oldest-account", "group-by-age",
+         "check-age-stats", "print-children", "find-similar-children-by-age")
+
+
+def create_database(database_url, data_dir, users_number, batch_size):
+    data_manager = DataManager(database_url,
+                               profile=get_profile("create_database", True))
+    with timer(f"{users_number} users: create_database"):
+        data_manager.create_database(data_dir, batch_size=batch_size)
+    data_manager.session.close()
+    data_manager.engine.dispose()
+
+
+def run_task(database_url, task, users_number, output_format):
+    data_manager = DataManager(database_url, create_schema=False,
+                               profile=get_profile(task, False))
+    data_manager.log_in(ADMIN_EMAIL, ADMIN_PASSWORD)
+    with timer(f"{users_number} users: {task} --format {output_format}"):
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            match_task(task, data_manager, output_format)
+    data_manager.session.close()
+    data_manager.engine.dispose()
+
+
+def main(args):
+    for users_number in args.users:
+        with tempfile.TemporaryDirectory() as data_dir, \
+                temporary_database_url() as database_url:
+            with timer(f"{users_number} users: generating dataset"):
+                write_dataset(data_dir, users_number,
+                              **generator_options(args))
+            create_database(database_url, data_dir, users_number,
+                            args.batch_size)
+            for task in args.tasks:
+                run_task(database_url, task, users_number, args.format)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+",
+                        default=[10000, 100000, 1000000])
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--tasks", nargs="+", default=list(TASKS),
+                        choices=list(TASKS))
+    parser.add_argument("--format", default="text",
+                        choices=["text", *FORMATS])
+    add_generator_arguments(parser)
+    main(parser.parse_args())
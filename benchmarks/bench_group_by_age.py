@@ -0,0 +1,66 @@
+"""
+Compares reading the precomputed statistics by
+DataManager.group_children_by_age with the former implementations:
+a single GROUP BY query and one COUNT query per distinct age.
+$ python -m benchmarks.bench_group_by_age --children 1000000
+"""
+import argparse
+
+from benchmarks.common import timer, temporary_database_url, \
+    create_data_manager
+from sqlalchemy import func
+
+from database.models import Child
+
+
+def group_children_by_age_per_age_queries(session):
+    """
+    The former implementation: loads all children, then runs a COUNT
+    query for each distinct age.
+    """
+    children = session.query(Child)
+    unique_ages = {child.age for child in children}
+    age_distribution = [
+        (age, children.filter_by(age=age).count())
+        for age in sorted(unique_ages)
+    ]
+    age_distribution.sort(key=lambda item: item[1])
+    return age_distribution
+
+
+def group_children_by_age_group_by_query(session):
+    """
+    The former implementation: a single GROUP BY query over all children.
+    """
+    children_count = func.count(Child.child_id)
+    age_distribution = session.query(Child.age, children_count) \
+        .group_by(Child.age) \
+        .order_by(children_count, Child.age)
+    return [tuple(row) for row in age_distribution]
+
+
+def main(args):
+    users_number = args.children // args.children_per_user
+    with temporary_database_url() as database_url:
+        with timer(f"populating database ({args.children} children)"):
+            data_manager = create_data_manager(
+                database_url, users_number, args.children_per_user)
+
+        with timer("per-age COUNT queries"):
+            expected = group_children_by_age_per_age_queries(
+                data_manager.session)
+        with timer("single GROUP BY query"):
+            group_by_result = group_children_by_age_group_by_query(
+                data_manager.session)
+        with timer("precomputed statistics"):
+            result = data_manager.group_children_by_age()
+
+        assert result == group_by_result == expected, "results differ"
+        data_manager.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--children", type=int, default=1000000)
+    parser.add_argument("--children-per-user", type=int, default=2)
+    main(parser.parse_args())
@@ -0,0 +1,86 @@
+"""
+Peak memory (RSS) of importing a data file with create_database
+in streaming mode, for a file and a file 10 times larger. Fails if
+the larger import needs more memory than SQLite is allowed to use by
+the profile (page cache and memory map, filled as the database grows)
+- all other memory must not depend on the size of the input.
+Each import is done in a fresh process.
+$ python -m benchmarks.bench_import_memory --users 100000 --profile bulk_load
+"""
+import argparse
+import contextlib
+import multiprocessing
+import os
+import resource
+import tempfile
+
+from benchmarks.common import temporary_database_url
+from benchmarks.dataset import DATASET_WRITERS, generate_users
+from database.data_manager import DataManager
+from database.models import SQLITE_PROFILES
+
+GROWTH_FACTOR = 10
+# SQLite default page cache size (in KiB)
+DEFAULT_CACHE_SIZE = 2000
+# allocator noise, in MiB
+RSS_TOLERANCE = 16
+
+
+def sqlite_memory_limit(profile):
+    """
+    :return: memory (in MiB) SQLite may use for the page cache and
+    the memory map with the given profile
+    """
+    pragmas = SQLITE_PROFILES.get(profile, {})
+    cache_size = pragmas.get("cache_size", -DEFAULT_CACHE_SIZE)
+    # positive values are numbers of pages
+    cache_kib = -cache_size if cache_size < 0 else cache_size * 4
+    return cache_kib / 1024 + pragmas.get("mmap_size", 0) / 2 ** 20
+
+
+def _import_file(data_dir, profile):
+    """
+    :return: peak RSS (in MiB) of the process after the import
+    """
+    with temporary_database_url() as database_url, \
+            open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stderr(devnull):
+        data_manager = DataManager(database_url, profile=profile)
+        data_manager.create_database(data_dir, stream=True)
+        data_manager.session.close()
+        data_manager.engine.dispose()
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure_peak_rss(data_dir, profile):
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(_import_file, (data_dir, profile))
+
+
+def main(args):
+    peak_rss = []
+    for users_number in (args.users, args.users * GROWTH_FACTOR):
+        with tempfile.TemporaryDirectory() as data_dir:
+            DATASET_WRITERS[args.format](
+                os.path.join(data_dir, f"users{args.format}"),
+                generate_users(users_number))
+            peak_rss.append(measure_peak_rss(data_dir, args.profile))
+        print(f"{args.format} {users_number} users, profile: "
+              f"{args.profile}: peak RSS {peak_rss[-1]:.1f} MiB")
+
+    growth = peak_rss[1] - peak_rss[0]
+    allowed_growth = sqlite_memory_limit(args.profile) + RSS_TOLERANCE
+    print(f"peak RSS growth: {growth:.1f} MiB, allowed: "
+          f"{allowed_growth:.1f} MiB (input grown {GROWTH_FACTOR}x)")
+    if growth > allowed_growth:
+        raise SystemExit("peak RSS grows with the input")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--format", default=".csv", choices=list(DATASET_WRITERS))
+    parser.add_argument("--profile", default=None,
+                        choices=list(SQLITE_PROFILES))
+    main(parser.parse_args())
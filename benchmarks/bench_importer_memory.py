@@ -0,0 +1,56 @@
+"""
+Peak memory (RSS) of iterating over a data importer, with the file loaded
+at once and read record by record (streaming mode), for growing files.
+Each measurement is done in a fresh process.
+$ python -m benchmarks.bench_importer_memory --users 10000 100000 1000000
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+
+from benchmarks.dataset import DATASET_WRITERS, generate_users
+from database.database_creator import DatabaseCreator
+
+
+def _consume_importer(filename, stream):
+    """
+    :return: peak RSS (in MiB) of the process after reading all records
+    """
+    Importer = DatabaseCreator.get_importer_for_file(filename)
+    importer = Importer(filename, stream=stream)
+    records = 0
+    for _ in importer:
+        records += 1
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure_peak_rss(filename, stream):
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(_consume_importer, (filename, stream))
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in args.formats:
+            for users_number in args.users:
+                filename = os.path.join(directory, f"users{extension}")
+                DATASET_WRITERS[extension](filename,
+                                           generate_users(users_number))
+                for stream in (False, True):
+                    mode = "streaming" if stream else "loading at once"
+                    peak_rss = measure_peak_rss(filename, stream)
+                    print(f"{extension} {users_number} users, {mode}: "
+                          f"peak RSS {peak_rss:.1f} MiB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+",
+                        default=[10000, 100000, 1000000])
+    parser.add_argument("--formats", nargs="+",
+                        default=list(DATASET_WRITERS),
+                        choices=list(DATASET_WRITERS))
+    main(parser.parse_args())
@@ -0,0 +1,46 @@
+"""
+Scaling of create_database with the number of processes loading and
+validating data files (--jobs).
+$ python -m benchmarks.bench_parallel_import --files 8 --users 50000
+"""
+import argparse
+import os
+import tempfile
+from itertools import islice
+
+from benchmarks.common import timer, temporary_database_url
+from benchmarks.dataset import DATASET_WRITERS, generate_users
+from database.data_manager import DataManager
+
+
+def write_data_files(directory, files_number, users_per_file):
+    extensions = list(DATASET_WRITERS)
+    # consecutive parts of the dataset, so that files don't share users
+    users = generate_users(files_number * users_per_file)
+    for i in range(files_number):
+        extension = extensions[i % len(extensions)]
+        path = os.path.join(directory, f"users_{i}{extension}")
+        DATASET_WRITERS[extension](path, islice(users, users_per_file))
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_data_files(data_dir, args.files, args.users)
+        for jobs in range(1, args.max_jobs + 1):
+            with temporary_database_url() as database_url:
+                data_manager = DataManager(database_url)
+                with timer(f"{args.files} files x {args.users} users, "
+                           f"jobs={jobs}"):
+                    data_manager.create_database(
+                        data_dir, batch_size=args.batch_size, jobs=jobs)
+                data_manager.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--users", type=int, default=50000,
+                        help="number of users per file")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--max-jobs", type=int, default=os.cpu_count())
+    main(parser.parse_args())
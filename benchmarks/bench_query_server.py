@@ -0,0 +1,77 @@
+"""
+Per-call latency of executing a task in a new process (as
+'python script.py <task>' does) compared with forwarding it to the query
+server with the thin client ('python client.py <task>').
+$ python -m benchmarks.bench_query_server --calls 20
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import temporary_database_url, create_data_manager, \
+    ADMIN_EMAIL, ADMIN_PASSWORD
+from modules.query_server import QueryServer
+from script import match_task
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the same steps as script.main, for a database given by url
+CLI_CALL = """
+import sys
+from database.data_manager import DataManager
+from script import match_task
+data_manager = DataManager(sys.argv[1])
+data_manager.log_in(sys.argv[3], sys.argv[4])
+match_task(sys.argv[2], data_manager)
+"""
+
+
+def measure_latency(command, calls):
+    """
+    :return: mean wall-clock time of running the command (in seconds)
+    """
+    start_time = time.perf_counter()
+    for _ in range(calls):
+        subprocess.run(command, cwd=PROJECT_DIR, check=True,
+                       stdout=subprocess.DEVNULL)
+    return (time.perf_counter() - start_time) / calls
+
+
+def main(args):
+    credentials = [ADMIN_EMAIL, ADMIN_PASSWORD]
+    with temporary_database_url() as database_url:
+        data_manager = create_data_manager(database_url, args.users)
+        data_manager.log_out()
+        socket_path = database_url.removeprefix("sqlite:///") + ".sock"
+        server = QueryServer(socket_path, data_manager, match_task)
+        server_thread = threading.Thread(target=server.serve_forever)
+        server_thread.start()
+        try:
+            for task in args.tasks:
+                cli_latency = measure_latency(
+                    [sys.executable, "-c", CLI_CALL, database_url, task,
+                     *credentials], args.calls)
+                client_latency = measure_latency(
+                    [sys.executable, "client.py", task,
+                     "--login", credentials[0],
+                     "--password", credentials[1],
+                     "--socket", socket_path], args.calls)
+                print(f"{task}: new process {cli_latency * 1000:.1f}ms, "
+                      f"query server {client_latency * 1000:.1f}ms")
+        finally:
+            server.shutdown()
+            server_thread.join()
+            server.server_close()
+            data_manager.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--tasks", nargs="+",
+                        default=["print-children", "print-all-accounts"])
+    main(parser.parse_args())
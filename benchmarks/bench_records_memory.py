@@ -0,0 +1,70 @@
+"""
+Memory held by the users read from a file: records emitted by the
+importers (UserRecord/ChildRecord) compared with the same data held as
+dictionaries (the former representation). Field values (strings, ints)
+are shared by both, so only the containers are compared.
+$ python -m benchmarks.bench_records_memory --users 1000000 --format .json
+"""
+import argparse
+import gc
+import os
+import tempfile
+import tracemalloc
+
+from benchmarks.common import timer
+from benchmarks.dataset import DATASET_WRITERS, generate_users
+from data_importer.records import ChildRecord, UserRecord
+from database.database_creator import DatabaseCreator
+
+
+def as_record(user):
+    return UserRecord(*user[:-1], [ChildRecord(*child)
+                                   for child in user.children])
+
+
+def as_dict(user):
+    user_data = user._asdict()
+    user_data["children"] = [child._asdict() for child in user.children]
+    return user_data
+
+
+def measure(build):
+    """
+    :return: result of 'build' and memory (in bytes) it retains
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, retained
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, f"users{args.format}")
+        with timer(f"writing {args.users} users"):
+            DATASET_WRITERS[args.format](filename,
+                                         generate_users(args.users))
+        Importer = DatabaseCreator.get_importer_for_file(filename)
+        with timer("reading records"):
+            records = list(Importer(filename))
+
+    children_number = sum(len(user.children) for user in records)
+    # measured separately from reading the file, so that only
+    # the containers (not the field values) are counted
+    _, records_size = measure(lambda: [as_record(user) for user in records])
+    _, dicts_size = measure(lambda: [as_dict(user) for user in records])
+
+    print(f"{len(records)} users, {children_number} children")
+    for label, size in (("dicts", dicts_size), ("records", records_size)):
+        print(f"{label}: {size / 2 ** 20:.1f} MiB, "
+              f"{size / len(records):.0f} bytes per user")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--format", default=".json", choices=list(DATASET_WRITERS))
+    main(parser.parse_args())
@@ -0,0 +1,32 @@
+"""
+Compares the text output of 'find-similar-children-by-age' (built from
+ORM objects) with machine-readable formats streamed from result rows.
+$ python -m benchmarks.bench_serializers --users 200000
+"""
+import argparse
+import os
+from contextlib import redirect_stdout
+
+from benchmarks.common import timer, temporary_database_url, \
+    create_data_manager
+from script import match_task
+
+TASK = "find-similar-children-by-age"
+
+
+def main(args):
+    with temporary_database_url() as database_url:
+        data_manager = create_data_manager(database_url, args.users)
+        for output_format in ("text", "json", "jsonl", "csv"):
+            with timer(f"{TASK} --format {output_format}"):
+                with open(os.devnull, "w") as devnull, \
+                        redirect_stdout(devnull):
+                    match_task(TASK, data_manager, output_format)
+            data_manager.session.expire_all()
+        data_manager.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200000)
+    main(parser.parse_args())
@@ -0,0 +1,66 @@
+"""
+Compares DataManager.users_w_similar_aged_children (lookups of the age
+index) with the former implementation (a scan of all children with
+a correlated EXISTS subquery), and a lookup for many users at once
+(DataManager.similar_aged_children_for_users) with a lookup per user.
+$ python -m benchmarks.bench_similar_children --users 200000
+"""
+import argparse
+
+from sqlalchemy import exists
+from sqlalchemy.orm import aliased
+
+from benchmarks.common import timer, temporary_database_url, \
+    create_data_manager
+from database.models import User, Child
+
+
+def similar_aged_children_exists_query(session, email):
+    """
+    The former implementation of users_w_similar_aged_children.
+    """
+    users_child = aliased(Child)
+    similar_age = exists().where(users_child.parent_id == email,
+                                 users_child.age == Child.age)
+    similar_aged_children = session.query(User, Child) \
+        .join(Child, Child.parent_id == User.email) \
+        .filter(Child.parent_id != email) \
+        .filter(similar_age) \
+        .order_by(Child.name, Child.child_id)
+    parents_children = {}
+    for parent, child in similar_aged_children:
+        parents_children.setdefault(parent, []).append(child)
+    return parents_children
+
+
+def main(args):
+    with temporary_database_url() as database_url:
+        with timer(f"populating database ({args.users} users)"):
+            data_manager = create_data_manager(
+                database_url, args.users, args.children_per_user)
+        session = data_manager.session
+        email = data_manager._authenticated_user.email
+
+        with timer("EXISTS query (1 user)"):
+            expected = similar_aged_children_exists_query(session, email)
+        with timer("age index lookup (1 user)"):
+            result = dict(data_manager.users_w_similar_aged_children())
+        assert result == expected, "results differ"
+
+        emails = [f"user{i}@example.com" for i in range(1, args.lookups + 1)]
+        with timer(f"age index lookup per user ({args.lookups} users)"):
+            expected = {
+                email: data_manager.similar_aged_children_for_users(
+                    [email])[email] for email in emails}
+        with timer(f"age index lookup in one pass ({args.lookups} users)"):
+            result = data_manager.similar_aged_children_for_users(emails)
+        assert result == expected, "results differ"
+        data_manager.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--children-per-user", type=int, default=1)
+    parser.add_argument("--lookups", type=int, default=20)
+    main(parser.parse_args())
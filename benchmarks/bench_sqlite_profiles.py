@@ -0,0 +1,70 @@
+"""
+Import and query times with the default SQLite settings compared with
+the 'bulk_load' and 'serving' profiles (see: database.models).
+$ python -m benchmarks.bench_sqlite_profiles --users 100000
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import timer, populate_database, \
+    temporary_database_url, ADMIN_EMAIL, ADMIN_PASSWORD
+from benchmarks.dataset import write_csv, generate_users
+from database.data_manager import DataManager
+
+QUERY_TASKS = {
+    "get_oldest_account": lambda data_manager:
+        data_manager.get_oldest_account(),
+    "group_children_by_age": lambda data_manager:
+        data_manager.group_children_by_age(),
+    "get_children": lambda data_manager:
+        list(data_manager.get_children())
+}
+
+
+def import_files(data_dir, profile, batch_size):
+    with temporary_database_url() as database_url:
+        data_manager = DataManager(database_url, profile=profile)
+        with timer(f"import, profile: {profile}, batch size: {batch_size}"):
+            data_manager.create_database(data_dir, batch_size=batch_size)
+        data_manager.engine.dispose()
+
+
+def run_queries(database_url, profile, calls):
+    data_manager = DataManager(database_url, create_schema=False,
+                               profile=profile)
+    data_manager.log_in(ADMIN_EMAIL, ADMIN_PASSWORD)
+    with timer(f"{calls} x {', '.join(QUERY_TASKS)}, profile: {profile}"):
+        for _ in range(calls):
+            for task in QUERY_TASKS:
+                QUERY_TASKS[task](data_manager)
+    data_manager.engine.dispose()
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as data_dir, \
+            tempfile.TemporaryDirectory() as per_user_dir:
+        write_csv(os.path.join(data_dir, "users.csv"),
+                  generate_users(args.users))
+        write_csv(os.path.join(per_user_dir, "users.csv"),
+                  generate_users(args.per_user_users))
+        for profile in (None, "bulk_load"):
+            import_files(data_dir, profile, args.batch_size)
+            import_files(per_user_dir, profile, 1)
+
+    with temporary_database_url() as database_url:
+        data_manager = DataManager(database_url)
+        populate_database(data_manager, args.users)
+        data_manager.engine.dispose()
+        for profile in (None, "serving"):
+            run_queries(database_url, profile, args.calls)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--per-user-users", type=int, default=2000,
+                        help="users imported one per transaction")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--calls", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,83 @@
+"""
+Cold-start cost of query tasks: import time of script.py measured with
+'python -X importtime' (together with the import time of modules deferred
+until create_database), and wall-clock time of a query task run in a new
+process with the former start-up steps (schema creation and role seeding)
+and without them.
+$ python -m benchmarks.bench_startup
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+from benchmarks.common import temporary_database_url, create_data_manager, \
+    ADMIN_EMAIL, ADMIN_PASSWORD
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_TIME_LINE = re.compile(
+    r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+QUERY_TASK = """
+import sys
+from database.data_manager import DataManager
+from script import match_task
+eager = sys.argv[2] == "eager"
+data_manager = DataManager(sys.argv[1], create_schema=eager)
+if eager:
+    data_manager.database_creator
+data_manager.log_in(sys.argv[3], sys.argv[4])
+match_task("print-children", data_manager)
+"""
+
+
+def import_times(module):
+    """
+    :return: dict {module: tuple (self, cumulative) import time in
+    microseconds} for the module and all modules imported by it
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            times[match.group(4)] = int(match.group(1)), int(match.group(2))
+    return times
+
+
+def measure_query_task(database_url, mode, runs):
+    start_time = time.perf_counter()
+    for _ in range(runs):
+        subprocess.run(
+            [sys.executable, "-c", QUERY_TASK, database_url, mode,
+             ADMIN_EMAIL, ADMIN_PASSWORD],
+            cwd=PROJECT_DIR, check=True, stdout=subprocess.DEVNULL)
+    return (time.perf_counter() - start_time) / runs
+
+
+def main(args):
+    script_times = import_times("script")
+    creator_times = import_times("database.database_creator")
+    deferred_modules = set(creator_times) - set(script_times)
+    deferred_time = sum(creator_times[module][0]
+                        for module in deferred_modules)
+    print(f"import script: {script_times['script'][1] / 1000:.1f}ms")
+    print(f"deferred until create_database: {len(deferred_modules)} "
+          f"modules, {deferred_time / 1000:.1f}ms")
+
+    with temporary_database_url() as database_url:
+        create_data_manager(database_url, 1).engine.dispose()
+        for mode in ("eager", "lazy"):
+            seconds = measure_query_task(database_url, mode, args.runs)
+            print(f"print-children in a new process ({mode} start-up): "
+                  f"{seconds * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    main(parser.parse_args())
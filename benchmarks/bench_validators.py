@@ -0,0 +1,71 @@
+"""
+Per-row cost of validation and telephone number normalization: the former
+implementation (re.fullmatch on pattern strings, filter + join) compared
+with precompiled patterns and the batch API.
+$ python -m benchmarks.bench_validators --rows 100000
+"""
+import argparse
+import re
+import timeit
+
+from data_importer.records import UserRecord, normalize_many, \
+    validate_many
+from utils.validators import email_regex, telephone_num_regex, \
+    is_valid_email, is_valid_telephone_number
+from utils.helpers import normalize_telephone_num
+
+TELEPHONE_NUMBERS = ("+48123456789", "00123456789", "(48) 123456789",
+                     "123 456 789", "123456789")
+
+
+def make_users(rows_number):
+    return [
+        UserRecord(
+            firstname="Justin",
+            telephone_number=TELEPHONE_NUMBERS[i % len(TELEPHONE_NUMBERS)],
+            email=f"user{i}@example.com",
+            password="+3t)mSM6xX",
+            role="user",
+            created_at="2022-11-25 02:19:37",
+            children=[]
+        ) for i in range(rows_number)
+    ]
+
+
+def normalize_with_filter(telephone_num):
+    return "".join(filter(str.isdigit, telephone_num))[-9:]
+
+
+def per_row_former(users):
+    for user in users:
+        telephone_number = normalize_with_filter(user.telephone_number)
+        re.fullmatch(email_regex, user.email)
+        re.fullmatch(telephone_num_regex, telephone_number)
+
+
+def per_row_compiled(users):
+    for user in users:
+        telephone_number = normalize_telephone_num(user.telephone_number)
+        is_valid_email(user.email)
+        is_valid_telephone_number(telephone_number)
+
+
+def batch(users):
+    validate_many(normalize_many(users))
+
+
+def main(args):
+    users = make_users(args.rows)
+    for label, function in (("former per-row", per_row_former),
+                            ("compiled per-row", per_row_compiled),
+                            ("batch API", batch)):
+        seconds = min(timeit.repeat(lambda: function(users),
+                                    number=1, repeat=args.repeat))
+        print(f"{label}: {seconds / args.rows * 1e6:.3f} us/row")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
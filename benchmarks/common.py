@@ -0,0 +1,90 @@
+"""
+Helpers shared by the benchmarks.
+"""
+import os
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from database.data_manager import DataManager
+from database.models import User, Child, Role
+from utils.helpers import chunked
+from utils.security import generate_password_hash, ADMIN_ROLE_NAME
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "admin-password"
+FIRST_NAMES = ("Anna", "Brian", "Carol", "David", "Ebony", "Frank",
+               "Grace", "Henry", "Irene", "Justin", "Kyle", "Laura")
+INSERT_CHUNK_SIZE = 10000
+
+
+@contextmanager
+def timer(label):
+    start_time = time.perf_counter()
+    yield
+    print(f"{label}: {time.perf_counter() - start_time:.3f}s")
+
+
+@contextmanager
+def temporary_database_url():
+    with tempfile.TemporaryDirectory() as directory:
+        yield f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+
+
+def _generate_users(users_number, children_per_user, role_ids, rnd):
+    password_hash = generate_password_hash(ADMIN_PASSWORD)
+    start_date = datetime.fromisoformat("2020-01-01 00:00:00")
+    for i in range(users_number):
+        email = ADMIN_EMAIL if i == 0 else f"user{i}@example.com"
+        role = ADMIN_ROLE_NAME if i == 0 else "user"
+        user_row = {
+            "email": email,
+            "firstname": rnd.choice(FIRST_NAMES),
+            "telephone_number": f"{100000000 + i}",
+            "password_hash": password_hash,
+            "role_id": role_ids[role],
+            "created_at": start_date + timedelta(minutes=i)
+        }
+        children_rows = [
+            {
+                "parent_id": email,
+                "name": rnd.choice(FIRST_NAMES),
+                "age": rnd.randint(0, 18)
+            } for _ in range(children_per_user)
+        ]
+        yield user_row, children_rows
+
+
+def populate_database(data_manager, users_number, children_per_user=2,
+                      seed=0):
+    """
+    Insert synthetic users (the first one - ADMIN_EMAIL - being an admin)
+    with random children using bulk inserts, then build the age
+    statistics.
+    """
+    session = data_manager.session
+    data_manager.database_creator  # inserts roles
+    role_ids = {role.name: role.role_id for role in session.query(Role)}
+    users = _generate_users(users_number, children_per_user, role_ids,
+                            random.Random(seed))
+    for batch in chunked(users, INSERT_CHUNK_SIZE):
+        session.execute(insert(User.__table__),
+                        [user_row for user_row, _ in batch])
+        session.execute(insert(Child.__table__),
+                        [child for _, children in batch for child in children])
+    session.commit()
+    data_manager.database_creator.rebuild_age_stats()
+
+
+def create_data_manager(database_url, users_number, children_per_user=2):
+    """
+    :return: DataManager with a populated database and logged-in admin
+    """
+    data_manager = DataManager(database_url)
+    populate_database(data_manager, users_number, children_per_user)
+    data_manager.log_in(ADMIN_EMAIL, ADMIN_PASSWORD)
+    return data_manager
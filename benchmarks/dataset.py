@@ -0,0 +1,185 @@
+"""
+Deterministic generator of large synthetic datasets, written as CSV,
+JSON and XML files in the formats read by the data importers.
+The first user is an admin (ADMIN_EMAIL, ADMIN_PASSWORD), which is never
+duplicated, so that tasks can be run against the created database.
+$ python -m benchmarks.dataset ./large_data --users 1000000 \
+    --duplicate-emails 0.01 --duplicate-phones 0.01 --phone-noise 0.2
+"""
+import argparse
+import csv
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from benchmarks.common import ADMIN_EMAIL, ADMIN_PASSWORD, FIRST_NAMES
+from data_importer.records import UserRecord, ChildRecord, USER_FIELDS
+from utils.security import ADMIN_ROLE_NAME
+
+START_DATE = datetime.fromisoformat("2020-01-01 00:00:00")
+# creation dates are spread over that many seconds
+CREATED_AT_RANGE = 4 * 365 * 24 * 3600
+ADMIN_RATE = 0.01
+MAX_CHILDREN = 3
+MAX_CHILD_AGE = 18
+# formats of the 9-digit number accepted by the importers
+PHONE_FORMATS = (
+    lambda number: f"+48{number}",
+    lambda number: f"(48){number}",
+    lambda number: f"+48 {number[:3]} {number[3:6]} {number[6:]}",
+    lambda number: f"{number[:3]}-{number[3:6]}-{number[6:]}",
+    lambda number: f"0048{number}"
+)
+
+
+def email_of(user_id):
+    return ADMIN_EMAIL if user_id == 0 else f"user{user_id}@example.com"
+
+
+def telephone_number_of(user_id):
+    return f"{100000000 + user_id}"
+
+
+def generate_users(users_number, seed=0, duplicate_emails=0.0,
+                   duplicate_phones=0.0, phone_noise=0.0):
+    """
+    :param duplicate_emails: fraction of users sharing the email with
+    a (random) previous user
+    :param duplicate_phones: fraction of users sharing the telephone
+    number with a previous user
+    :param phone_noise: fraction of telephone numbers written in one of
+    PHONE_FORMATS instead of 9 digits
+    :return: generator of UserRecords
+    """
+    rnd = random.Random(seed)
+    for user_id in range(users_number):
+        email_id = phone_id = user_id
+        if user_id > 1:
+            if rnd.random() < duplicate_emails:
+                email_id = rnd.randrange(1, user_id)
+            if rnd.random() < duplicate_phones:
+                phone_id = rnd.randrange(1, user_id)
+
+        telephone_number = telephone_number_of(phone_id)
+        if rnd.random() < phone_noise:
+            telephone_number = rnd.choice(PHONE_FORMATS)(telephone_number)
+
+        if user_id == 0:
+            password, role, seconds = ADMIN_PASSWORD, ADMIN_ROLE_NAME, 0
+        else:
+            password = f"password{user_id}"
+            role = ADMIN_ROLE_NAME if rnd.random() < ADMIN_RATE else "user"
+            seconds = rnd.randrange(1, CREATED_AT_RANGE)
+
+        children = [
+            ChildRecord(rnd.choice(FIRST_NAMES),
+                        rnd.randint(0, MAX_CHILD_AGE))
+            for _ in range(rnd.randint(0, MAX_CHILDREN))
+        ]
+        yield UserRecord(
+            firstname=rnd.choice(FIRST_NAMES),
+            telephone_number=telephone_number,
+            email=email_of(email_id),
+            password=password,
+            role=role,
+            created_at=str(START_DATE + timedelta(seconds=seconds)),
+            children=children
+        )
+
+
+def write_csv(path, users):
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file, delimiter=";")
+        writer.writerow(USER_FIELDS)
+        for user in users:
+            children = ",".join(f"{child.name} ({child.age})"
+                                for child in user.children)
+            writer.writerow((*user[:-1], children))
+
+
+def write_json(path, users):
+    with open(path, "w") as file:
+        file.write("[")
+        for i, user in enumerate(users):
+            i and file.write(",\n")
+            user_data = user._asdict()
+            user_data["children"] = [child._asdict()
+                                     for child in user.children]
+            json.dump(user_data, file)
+        file.write("]")
+
+
+def write_xml(path, users):
+    with open(path, "w") as file:
+        file.write("<users>")
+        for user in users:
+            file.write("<user>")
+            for field, value in zip(USER_FIELDS[:-1], user):
+                file.write(f"<{field}>{escape(value)}</{field}>")
+            file.write("<children>")
+            for child in user.children:
+                file.write(f"<child><name>{escape(child.name)}</name>"
+                           f"<age>{child.age}</age></child>")
+            file.write("</children></user>")
+        file.write("</users>")
+
+
+DATASET_WRITERS = {
+    ".csv": write_csv,
+    ".json": write_json,
+    ".xml": write_xml
+}
+
+
+def write_dataset(directory, users_number, formats=tuple(DATASET_WRITERS),
+                  **options):
+    """
+    Write generated users to one file per format, split into
+    consecutive parts of (nearly) equal size.
+    :param options: options of 'generate_users'
+    :return: list of written files
+    """
+    users = generate_users(users_number, **options)
+    paths = []
+    for i, extension in enumerate(formats):
+        part_size = (users_number * (i + 1) // len(formats)
+                     - users_number * i // len(formats))
+        path = os.path.join(directory, f"users{extension}")
+        DATASET_WRITERS[extension](path, islice(users, part_size))
+        paths.append(path)
+    return paths
+
+
+def add_generator_arguments(parser):
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--duplicate-emails", type=float, default=0.0)
+    parser.add_argument("--duplicate-phones", type=float, default=0.0)
+    parser.add_argument("--phone-noise", type=float, default=0.0)
+    parser.add_argument("--formats", nargs="+",
+                        default=list(DATASET_WRITERS),
+                        choices=list(DATASET_WRITERS))
+
+
+def generator_options(args):
+    return {
+        "formats": args.formats,
+        "seed": args.seed,
+        "duplicate_emails": args.duplicate_emails,
+        "duplicate_phones": args.duplicate_phones,
+        "phone_noise": args.phone_noise
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory")
+    parser.add_argument("--users", type=int, default=100000)
+    add_generator_arguments(parser)
+    args = parser.parse_args()
+    os.makedirs(args.directory, exist_ok=True)
+    for path in write_dataset(args.directory, args.users,
+                              **generator_options(args)):
+        print(path)
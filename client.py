@@ -0,0 +1,44 @@
+"""
+Thin client executing tasks on the query server, started with:
+$ python script.py serve
+"""
+import argparse
+import sys
+
+from modules.query_server import send_request, SOCKET_PATH
+from modules.serializers import FORMATS
+from utils.exceptions import QueryServerError
+
+
+def main(args):
+    login = args.login or ""
+    password = args.password or ""
+
+    if not login or not password:
+        print("Please provide full credentials.")
+        exit(1)
+
+    try:
+        output = send_request(args.task, login, password, args.socket,
+                              args.format)
+    except (ConnectionError, FileNotFoundError):
+        print(f"Query server is not running ({args.socket}).",
+              file=sys.stderr)
+        exit(1)
+    except QueryServerError as e:
+        print(f"Query server error: {e}", file=sys.stderr)
+        exit(1)
+    sys.stdout.write(output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    for argument in ["task", "--login", "--password"]:
+        parser.add_argument(argument)
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    parser.add_argument("--format", choices=("text", *FORMATS),
+                        default="text",
+                        help="output format of query tasks")
+
+    client_args = parser.parse_args()
+    main(client_args)
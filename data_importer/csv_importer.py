@@ -2,10 +2,11 @@ import re
 import csv
 
 from data_importer.data_importer import DataImporter
+from data_importer.records import UserRecord, ChildRecord
 
 
 class CSVImporter(DataImporter):
-    child_regex = "(\w+)\s\((\d{1,2})\)"
+    child_regex = re.compile(r"(\w+)\s\((\d{1,2})\)")
 
     def _read_children(self, children):
         if not children:
@@ -18,20 +19,28 @@ class CSVImporter(DataImporter):
         return children_output
 
     def _parse_child(self, child):
-        child_data = dict()
-        child_match = re.match(self.child_regex, child)
-        child_data["name"] = child_match.group(1)
-        child_data["age"] = int(child_match.group(2))
-        return child_data
+        child_match = self.child_regex.match(child)
+        return ChildRecord(child_match.group(1), int(child_match.group(2)))
 
-    def _read_rows(self, reader):
-        rows = []
-        children_fieldnames = ("name", "age")
+    def _iter_rows(self, reader):
         for row in reader:
-            children = self._read_children(row["children"])
-            rows.append({**row, "children": children})
-        return rows
+            yield UserRecord(
+                firstname=row["firstname"],
+                telephone_number=row["telephone_number"],
+                email=row["email"],
+                password=row["password"],
+                role=row["role"],
+                created_at=row["created_at"],
+                children=self._read_children(row["children"])
+            )
+
+    def _read_rows(self, reader):
+        return list(self._iter_rows(reader))
 
     def import_from_file(self, file):
         reader = csv.DictReader(file, delimiter=";")
         return self._read_rows(reader)
+
+    def iter_from_file(self, file):
+        reader = csv.DictReader(file, delimiter=";")
+        return self._iter_rows(reader)
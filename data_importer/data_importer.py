@@ -2,7 +2,16 @@ class DataImporter:
     """
     Abstract class for data importers (JSON, CSV, XML).
     """
-    def __init__(self, filename):
+    file_mode = "r"
+
+    def __init__(self, filename, stream=False):
+        """
+        :param filename: path to the file with data
+        :param stream: if True, data is not loaded at once, but read
+        from the file (record by record) while iterating over the importer
+        """
+        self.filename = filename
+        self.stream = stream
         self.filedata = None
         self.converted_data = None
         self.is_loaded = False
@@ -21,14 +30,29 @@ class DataImporter:
             self.is_loaded = True
 
     def load_data(self, filename):
-        with open(filename, "r") as file:
-            self.converted_data = self.import_from_file(file)
+        with open(filename, self.file_mode) as file:
+            if not self.stream:
+                self.converted_data = self.import_from_file(file)
 
     def import_from_file(self, file):
         """
-        Import data from file into Python dict.
+        Import data from file into a list of UserRecords.
         """
         pass
 
+    def iter_from_file(self, file):
+        """
+        Iterate over data read from file, used in streaming mode.
+        Should be overridden by importers able to parse data
+        incrementally.
+        """
+        return iter(self.import_from_file(file))
+
+    def _stream_data(self):
+        with open(self.filename, self.file_mode) as file:
+            yield from self.iter_from_file(file)
+
     def __iter__(self):
+        if self.stream:
+            return self._stream_data()
         return iter(self.converted_data)
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+from utils.helpers import normalize_telephone_num
+from utils.validators import is_valid_email, is_valid_telephone_number
+
+
+class Deduplicator:
+    """
+    Merges user records from many importers, removing duplicates (by email
+    or telephone number) before they reach the database. Of duplicated
+    entries the newer one (based on the 'created_at' timestamp) is kept;
+    on equal timestamps - the one added first.
+    Entries with invalid email or telephone number are passed
+    through unchanged, so that they can be reported (and rejected)
+    by the DatabaseCreator.
+    """
+
+    def __init__(self, users=()):
+        # kept entries in the order of adding, evicted entries
+        # are replaced by None
+        self._entries = []
+        self._by_email = {}
+        self._by_phone = {}
+        self.add_all(users)
+
+    @staticmethod
+    def _get_identity(user):
+        """
+        :return: tuple (email, normalized telephone number, creation date)
+        or None if email or telephone number is invalid.
+        """
+        telephone_number = normalize_telephone_num(user.telephone_number)
+        if not (is_valid_email(user.email)
+                and is_valid_telephone_number(telephone_number)):
+            return None
+        created_at = datetime.fromisoformat(user.created_at)
+        return user.email, telephone_number, created_at
+
+    def _evict(self, position):
+        _, _, email, telephone_number = self._entries[position]
+        del self._by_email[email]
+        del self._by_phone[telephone_number]
+        self._entries[position] = None
+
+    def add(self, user):
+        """
+        Add user data, replacing all older duplicates of the entry.
+        :return: False if the entry was rejected as an older duplicate
+        """
+        identity = self._get_identity(user)
+        if identity is None:
+            self._entries.append((user, None, None, None))
+            return True
+
+        email, telephone_number, created_at = identity
+        # one entry can collide with two others: by email and by phone
+        conflicts = {
+            self._by_email.get(email), self._by_phone.get(telephone_number)
+        } - {None}
+        if any(self._entries[position][1] >= created_at
+               for position in conflicts):
+            return False
+
+        for position in conflicts:
+            self._evict(position)
+        position = len(self._entries)
+        self._entries.append((user, created_at, email, telephone_number))
+        self._by_email[email] = position
+        self._by_phone[telephone_number] = position
+        return True
+
+    def add_all(self, users):
+        for user in users:
+            self.add(user)
+
+    def __iter__(self):
+        return (entry[0] for entry in self._entries if entry is not None)
+
+    def __len__(self):
+        return len(self._entries) - self._entries.count(None)
+
+
+class PreparedUsersDeduplicator(Deduplicator):
+    """
+    Deduplicator for already validated and normalized users, in the form
+    of (user row, children rows) tuples (see: DatabaseCreator.prepare_user).
+    """
+
+    @staticmethod
+    def _get_identity(user):
+        user_row, _ = user
+        return (user_row["email"], user_row["telephone_number"],
+                user_row["created_at"])
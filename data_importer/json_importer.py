@@ -1,8 +1,88 @@
 import json
+import re
 
 from data_importer.data_importer import DataImporter
+from data_importer.records import UserRecord
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
 
 
 class JsonImporter(DataImporter):
+    # number of characters read from the file at once in streaming mode
+    read_size = 64 * 1024
+
     def import_from_file(self, file):
-        return json.load(file)
+        return [UserRecord.from_dict(user) for user in json.load(file)]
+
+    def iter_from_file(self, file):
+        return (UserRecord.from_dict(user) for user in self.iter_items(file))
+
+    def iter_items(self, file):
+        """
+        Decode items of the top-level JSON array one by one, reading
+        the file in chunks of 'read_size' characters.
+        """
+        decoder = json.JSONDecoder()
+        buffer = ""
+        position = 0
+        end_of_file = False
+
+        def read_more():
+            nonlocal buffer, position, end_of_file
+            chunk = file.read(self.read_size)
+            end_of_file = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+
+        def next_char():
+            """
+            Skip whitespace, return the next character (or an empty string
+            at the end of the file).
+            """
+            nonlocal position
+            while True:
+                position = WHITESPACE.match(buffer, position).end()
+                if position < len(buffer) or end_of_file:
+                    return buffer[position:position + 1]
+                read_more()
+
+        def expect(characters):
+            char = next_char()
+            if not char or char not in characters:
+                raise json.JSONDecodeError(
+                    f"Expecting one of: {characters!r}", buffer, position)
+            return char
+
+        def expect_end():
+            nonlocal position
+            position += 1
+            if next_char():
+                raise json.JSONDecodeError("Extra data", buffer, position)
+
+        expect("[")
+        position += 1
+        if next_char() == "]":
+            expect_end()
+            return
+
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                item, end = None, None
+            # an item is complete if it is followed by any character
+            # (numbers could be cut at the end of the buffer)
+            if end is None or (end == len(buffer) and not end_of_file):
+                if end_of_file:
+                    raise json.JSONDecodeError(
+                        "Unterminated array item", buffer, position)
+                read_more()
+                continue
+
+            position = end
+            yield item
+            if expect(",]") == "]":
+                expect_end()
+                return
+            position += 1
+            next_char()
@@ -0,0 +1,78 @@
+"""
+Compact (tuple-based, without per-instance dict) records emitted
+by the data importers.
+"""
+from collections import namedtuple
+
+from utils.helpers import normalize_telephone_num
+from utils.validators import EMAIL_PATTERN, TELEPHONE_NUM_PATTERN
+
+USER_FIELDS = ("firstname", "telephone_number", "email", "password",
+               "role", "created_at", "children")
+
+
+class ChildRecord(namedtuple("ChildRecord", ("name", "age"))):
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data["age"])
+
+
+class UserRecord(namedtuple("UserRecord", USER_FIELDS)):
+    """
+    User data; 'children' is a list of ChildRecords.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        :param data: dictionary with user data (with children
+        as dictionaries)
+        """
+        return cls(
+            firstname=data["firstname"],
+            telephone_number=data["telephone_number"],
+            email=data["email"],
+            password=data["password"],
+            role=data["role"],
+            created_at=data["created_at"],
+            children=[ChildRecord.from_dict(child)
+                      for child in data["children"]]
+        )
+
+
+def normalize_many(users):
+    """
+    :param users: list of UserRecords
+    :return: list of copies of the records with normalized
+    telephone numbers
+    """
+    # unpacking is faster than UserRecord._replace
+    return [
+        UserRecord(firstname, normalize_telephone_num(telephone_number),
+                   email, password, role, created_at, children)
+        for firstname, telephone_number, email, password, role, created_at,
+        children in users
+    ]
+
+
+def validate_many(users):
+    """
+    Split users into those with valid and invalid email or (already
+    normalized) telephone number.
+    :param users: list of UserRecords
+    :return: tuple (list of valid users, list of invalid users)
+    """
+    email_fullmatch = EMAIL_PATTERN.fullmatch
+    telephone_num_fullmatch = TELEPHONE_NUM_PATTERN.fullmatch
+    valid_users = []
+    invalid_users = []
+    for user in users:
+        if (email_fullmatch(user.email)
+                and telephone_num_fullmatch(user.telephone_number)):
+            valid_users.append(user)
+        else:
+            invalid_users.append(user)
+    return valid_users, invalid_users
@@ -1,31 +1,46 @@
 from data_importer.data_importer import DataImporter
+from data_importer.records import UserRecord, ChildRecord, USER_FIELDS
 from lxml import etree
 
 
 class XMLImporter(DataImporter):
+    # lxml parses raw bytes, decoding them according to the
+    # XML declaration
+    file_mode = "rb"
+
     @staticmethod
     def read_children(children):
         output = []
         for child in children:
-            child_data = {
-                "name": child.find("name").text,
-                "age": int(child.find("age").text)
-            }
-            output.append(child_data)
+            output.append(ChildRecord(child.find("name").text,
+                                      int(child.find("age").text)))
         return output
 
+    def read_user(self, user):
+        data = {}
+        for prop in user:
+            if prop.tag == "children":
+                data[prop.tag] = self.read_children(prop)
+            else:
+                data[prop.tag] = prop.text
+        return UserRecord(**{field: data[field] for field in USER_FIELDS})
+
     def import_from_file(self, file):
         parser = etree.XMLParser(recover=True)
         tree = etree.parse(file, parser=parser)
         users = tree.getroot()
         output = []
         for user in users:
-            data = {}
-            for prop in user:
-                if prop.tag == "children":
-                    data[prop.tag] = self.read_children(prop)
-                else:
-                    data[prop.tag] = prop.text
-            output.append(data)
+            output.append(self.read_user(user))
 
         return output
+
+    def iter_from_file(self, file):
+        users = etree.iterparse(file, events=("end",), tag="user",
+                                recover=True)
+        for _, user in users:
+            yield self.read_user(user)
+            # free memory taken by already processed elements
+            user.clear()
+            while user.getprevious() is not None:
+                del user.getparent()[0]
@@ -0,0 +1,71 @@
+"""
+Column-oriented, in-memory snapshot of users and children for admin
+reports (see: DataManager.load_columnar_snapshot). Requires numpy
+(optional dependency).
+"""
+from sqlalchemy import select, func, cast, Integer
+
+from database.models import User, Child
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ColumnarSnapshot:
+    """
+    Users are sorted by email; children refer to their parents
+    by the position in user arrays.
+    """
+
+    def __init__(self, emails, created_at, role_ids, ages, parent_indices):
+        """
+        :param emails: array of users' emails
+        :param created_at: array of users' creation dates (int64 seconds
+        since the epoch)
+        :param role_ids: array of users' role ids
+        :param ages: array of children's ages
+        :param parent_indices: array of parents' positions in user arrays
+        """
+        self.emails = emails
+        self.created_at = created_at
+        self.role_ids = role_ids
+        self.ages = ages
+        self.parent_indices = parent_indices
+
+    @classmethod
+    def load(cls, session):
+        """
+        Load the snapshot from the database.
+        """
+        if np is None:
+            raise ImportError("numpy is required for columnar analytics.")
+
+        # core queries - rows aren't processed by the ORM
+        connection = session.connection()
+        users = connection.execute(
+            select(User.email,
+                   cast(func.strftime("%s", User.created_at), Integer),
+                   User.role_id)
+            .order_by(User.email)).all()
+        emails = np.array([email for email, _, _ in users], dtype=str)
+        created_at = np.fromiter((created_at for _, created_at, _ in users),
+                                 dtype=np.int64, count=len(users))
+        role_ids = np.fromiter((role_id for _, _, role_id in users),
+                               dtype=np.int32, count=len(users))
+        del users
+
+        children = connection.execute(
+            select(Child.parent_id, Child.age)).all()
+        parent_ids = np.array([parent_id for parent_id, _ in children],
+                              dtype=str)
+        ages = np.fromiter((age for _, age in children), dtype=np.int16,
+                           count=len(children))
+        del children
+        parent_indices = np.searchsorted(emails, parent_ids).astype(np.int32)
+
+        return cls(emails, created_at, role_ids, ages, parent_indices)
+
+    def accounts_total_number(self):
+        return len(self.emails)
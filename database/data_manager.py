@@ -1,27 +1,95 @@
-import re
 import sys
+from functools import cached_property
+from itertools import groupby
 
-from database.database_creator import DatabaseCreator
-from database.models import start_engine, drop_all, User, Child
+from sqlalchemy import select, func, literal, Integer, inspect
+from sqlalchemy.orm import aliased
+
+from database.models import start_engine, drop_all, User, Child, \
+    ChildrenAgeStats, MAX_IN_CLAUSE_PARAMS
+from utils.auth_cache import CachedCredentials
 from utils.exceptions import InvalidCredentialsError
-from utils.helpers import list_files_for_import
+from utils.helpers import list_files_for_import, chunked
 from utils.security import login_required, admin_required
-from utils.validators import email_regex, telephone_num_regex
+from utils.validators import is_valid_email, is_valid_telephone_number
+
+# number of rows fetched at once by ORM queries whose results are
+# consumed while iterating
+YIELD_PER_ROWS = 1000
 
 
 class DataManager:
-    def __init__(self, database_url="sqlite:///:memory:"):
-        self.engine, self.session = start_engine(database_url)
-        self.database_creator = DatabaseCreator(self.session)
+    def __init__(self, database_url="sqlite:///:memory:", create_schema=True,
+                 auth_cache=None, profile=None):
+        """
+        :param create_schema: create missing tables; can be skipped
+        for an existing database
+        :param auth_cache: optional AuthenticationCache, which allows
+        logging-in without querying the database
+        :param profile: SQLite performance profile (see: SQLITE_PROFILES)
+        """
+        self.engine, self.session = start_engine(database_url, create_schema,
+                                                 profile)
+        self.auth_cache = auth_cache
+        self.columnar_snapshot = None
         self._authenticated_user = None
+        # (DBAPI connection, its data_version) at the last log-in
+        self._data_version = None
+
+    @cached_property
+    def database_creator(self):
+        # importers (and lxml) are needed only for creating the database,
+        # so they are not loaded by query tasks
+        from database.database_creator import DatabaseCreator
+        return DatabaseCreator(self.session, auth_cache=self.auth_cache)
+
+    def load_columnar_snapshot(self):
+        """
+        Load a column-oriented snapshot of the database (requires numpy),
+        used for counting accounts until the database is created again
+        (the oldest account and children by age are found faster using
+        the index and the age statistics table).
+        """
+        from database.columnar import ColumnarSnapshot
+        self.columnar_snapshot = ColumnarSnapshot.load(self.session)
+
+    def _clear_cache_on_external_writes(self):
+        """
+        Clear the authentication cache if the database was changed by
+        another process (e.g. create_database) since the last log-in:
+        SQLite's 'data_version' of a connection changes when other
+        connections commit changes.
+        """
+        connection = self.session.connection()
+        data_version = (
+            connection.connection.dbapi_connection,
+            connection.exec_driver_sql("PRAGMA data_version").scalar())
+        if data_version != self._data_version:
+            self.auth_cache.clear()
+            self._data_version = data_version
+
+    def _log_in_from_cache(self, login, password):
+        """
+        :return: True if the user was authenticated with cached credentials
+        """
+        credentials = self.auth_cache.get(login)
+        if credentials is None or not credentials.verify_password(password):
+            return False
+        self._authenticated_user = credentials
+        return True
 
     def log_in(self, login, password):
+        if self.auth_cache is not None:
+            self._clear_cache_on_external_writes()
+            if self._log_in_from_cache(login, password):
+                return
+
         user = None
         user_query = self.session.query(User)
 
-        if re.fullmatch(email_regex, login):
+        if is_valid_email(login):
             user = user_query.filter_by(email=login).first()
-        elif re.fullmatch(telephone_num_regex, login):
+        elif is_valid_telephone_number(login):
             user = user_query.filter_by(telephone_number=login).first()
 
         if user is not None and user.verify_password(password):
@@ -29,6 +97,9 @@ class DataManager:
         else:
             raise InvalidCredentialsError
 
+        if self.auth_cache is not None:
+            self.auth_cache.put(login, CachedCredentials.from_user(user))
+
     def log_out(self):
         self._authenticated_user = None
 
@@ -37,7 +108,22 @@ class DataManager:
     def drop_database(self):
         drop_all(self.engine)
 
-    def create_database(self, toplevel_dir):
+    def create_database(self, toplevel_dir, batch_size=None, stream=False,
+                        jobs=1):
+        """
+        Import data from files found in a top-level directory.
+        :param batch_size: number of users imported within a single
+        transaction (see: DatabaseCreator)
+        :param stream: read files record by record instead of loading
+        them into memory
+        :param jobs: number of processes loading and validating files
+        """
+        if self.auth_cache is not None:
+            self.auth_cache.clear()
+        self.columnar_snapshot = None
+        self.database_creator.batch_size = batch_size
+        self.database_creator.stream = stream
+        self.database_creator.jobs = jobs
         file_extensions = [".xml", ".json", ".csv"]
         files_for_import = list_files_for_import(
             toplevel_dir, file_extensions)
@@ -51,6 +137,8 @@ class DataManager:
         """
         Print The Number of All Valid Accounts
         """
+        if self.columnar_snapshot is not None:
+            return self.columnar_snapshot.accounts_total_number()
         return self.session.query(User).count()
 
     @login_required
@@ -65,19 +153,47 @@ class DataManager:
     @login_required
     @admin_required
     def group_children_by_age(self):
-        children = self.session.query(Child)
-        unique_ages = {
-            child.age for child in children
-        }
-        age_distribution = [
-            {
-                "age": age,
-                "count": children.filter_by(age=age).count()
-            } for age in sorted(unique_ages)
-        ]
-        age_distribution.sort(key=lambda item: item["count"])
-
-        return age_distribution
+        """
+        Number of children in each age, read from the precomputed
+        'children_age_stats' table.
+        :return: list of (age, count) tuples sorted by count (ascending),
+        then by age
+        """
+        age_distribution = self.session.execute(
+            self._select_children_by_age())
+
+        return [tuple(row) for row in age_distribution]
+
+    def _select_children_by_age(self):
+        """
+        Helper to 'group_children_by_age': children are counted using
+        the 'children' table in databases created before the precomputed
+        statistics were introduced.
+        """
+        if inspect(self.session.connection()).has_table(
+                ChildrenAgeStats.__tablename__):
+            return select(
+                ChildrenAgeStats.age,
+                ChildrenAgeStats.children_number.label("count")) \
+                .order_by(ChildrenAgeStats.children_number,
+                          ChildrenAgeStats.age)
+
+        print("Age statistics are missing - run check-age-stats to "
+              "create them.", file=sys.stderr)
+        children_number = func.count(Child.child_id)
+        return select(Child.age, children_number.label("count")) \
+            .group_by(Child.age) \
+            .order_by(children_number, Child.age)
+
+    @login_required
+    @admin_required
+    def check_age_stats(self):
+        """
+        Check the precomputed number of children in each age against
+        the 'children' table, rebuilding it if inconsistent.
+        :return: True if the precomputed statistics were consistent
+        """
+        return self.database_creator.rebuild_age_stats()
 
     @login_required
     def get_children(self):
@@ -85,34 +201,155 @@ class DataManager:
         Return information about the user's children.
         :return: alphabetically sorted query object
         """
-        return self._authenticated_user.children.order_by(Child.name)
+        return self.session.query(Child) \
+            .filter_by(parent_id=self._authenticated_user.email) \
+            .order_by(Child.name)
 
     @login_required
     def users_w_similar_aged_children(self):
         """
         Find users with children of the same age as at least one child
         ownd by the user.
+        :return: generator of tuples (parent, list of parent's children
+        of similar age), children sorted alphabetically by name; parents
+        come in the order of their first (alphabetically) matched child
+        """
+        email = self._authenticated_user.email
+        users_child = aliased(Child)
+        users_ages = select(users_child.age) \
+            .where(users_child.parent_id == email)
+        # rows of each parent come together, ordered by the parent's first
+        # matched child (by name, then id)
+        first_child_name = func.min(Child.name).over(
+            partition_by=Child.parent_id)
+        first_child_id = func.first_value(Child.child_id).over(
+            partition_by=Child.parent_id,
+            order_by=(Child.name, Child.child_id))
+        similar_aged_children = self.session.query(User, Child) \
+            .join(Child, Child.parent_id == User.email) \
+            .filter(Child.age.in_(users_ages), Child.parent_id != email) \
+            .order_by(first_child_name, first_child_id,
+                      Child.name, Child.child_id) \
+            .yield_per(YIELD_PER_ROWS)
+
+        return ((parent, [child for _, child in rows])
+                for parent, rows in groupby(similar_aged_children,
+                                            key=lambda row: row[0]))
+
+    @login_required
+    @admin_required
+    def similar_aged_children_for_users(self, emails):
         """
-        user = self._authenticated_user
-        user_children_ages = {child.age for child in user.children}
-        all_children = self.session.query(Child)
-        children_with_similar_ages = all_children.filter(
-            Child.age.in_(user_children_ages)).filter(
-            Child.parent_id != user.email)  # excluding user's children
-
-        # results have to be sorted alphabetically by each child's name
-        # dict since Python 3.7 is an ordered data structured
-        # (set is not)
-        parents = {
-            child.parent: "" for child
-            in children_with_similar_ages.order_by(Child.name)
-        }
-        parents_children = {
-            parent: sorted(
-                [child for child in parent.children
-                 if child in children_with_similar_ages],
-                key=lambda c: c.name)
-            for parent in parents
-        }
-
-        return parents_children
+        Find users with children of similar age for many users at once.
+        :param emails: emails of users
+        :return: dict {email: dict {parent: list of parent's children
+        of similar age}} - ordered as by 'users_w_similar_aged_children'
+        """
+        return self._find_similar_aged_children(emails)
+
+    def _execute_report(self, statement):
+        """
+        Execute a report's query with Core (as ColumnarSnapshot.load),
+        so that rows are fetched from the cursor as they are consumed
+        (ORM-enabled execution fetches all rows at once).
+        :return: SQLAlchemy result
+        """
+        return self.session.connection().execute(statement)
+
+    @login_required
+    @admin_required
+    def accounts_report(self):
+        """
+        Reports return rows (without building ORM objects) for
+        machine-readable output (see: modules.serializers).
+        :return: SQLAlchemy result with the number of accounts
+        (counted as by 'accounts_total_number')
+        """
+        if self.columnar_snapshot is not None:
+            accounts = literal(
+                self.columnar_snapshot.accounts_total_number(), Integer)
+            return self._execute_report(select(accounts.label("accounts")))
+        return self._execute_report(
+            select(func.count().label("accounts")).select_from(User))
+
+    @login_required
+    @admin_required
+    def oldest_account_report(self):
+        """
+        :return: SQLAlchemy result with the oldest account
+        """
+        return self._execute_report(
+            select(User.firstname, User.email, User.created_at)
+            .order_by(User.created_at)
+            .limit(1))
+
+    @login_required
+    @admin_required
+    def children_by_age_report(self):
+        """
+        :return: SQLAlchemy result with the number of children in each age
+        (ordered as by 'group_children_by_age')
+        """
+        return self._execute_report(self._select_children_by_age())
+
+    @login_required
+    def children_report(self):
+        """
+        :return: SQLAlchemy result with the user's children sorted by name
+        """
+        return self._execute_report(
+            select(Child.name, Child.age)
+            .where(Child.parent_id == self._authenticated_user.email)
+            .order_by(Child.name))
+
+    @login_required
+    def similar_aged_children_report(self):
+        """
+        :return: SQLAlchemy result with children of the same age as any
+        of the user's children, together with their parents (one row per
+        child, sorted by the child's name)
+        """
+        email = self._authenticated_user.email
+        users_child = aliased(Child)
+        users_ages = select(users_child.age) \
+            .where(users_child.parent_id == email)
+        return self._execute_report(
+            select(User.firstname.label("parent_firstname"),
+                   User.telephone_number.label("parent_telephone_number"),
+                   Child.name, Child.age)
+            .join(Child, Child.parent_id == User.email)
+            .where(Child.age.in_(users_ages), Child.parent_id != email)
+            .order_by(Child.name, Child.child_id))
+
+    def _find_similar_aged_children(self, emails):
+        """
+        Helper to 'similar_aged_children_for_users': fetches children of all
+        ages found among children of the given users with a single
+        lookup of the age index.
+        """
+        users_by_age = {}
+        for email_chunk in chunked(emails, MAX_IN_CLAUSE_PARAMS):
+            users_ages = self.session.query(Child.parent_id, Child.age) \
+                .filter(Child.parent_id.in_(email_chunk)) \
+                .distinct()
+            for email, age in users_ages:
+                users_by_age.setdefault(age, []).append(email)
+
+        results = {email: {} for email in emails}
+        if not users_by_age:
+            return results
+
+        similar_aged_children = self.session.query(User, Child) \
+            .join(Child, Child.parent_id == User.email) \
+            .filter(Child.age.in_(users_by_age)) \
+            .order_by(Child.name, Child.child_id)
+
+        # rows are sorted by child's name, so are the children lists;
+        # parents (dict is an ordered data structure) come in the order
+        # of their first (alphabetically) matched child
+        for parent, child in similar_aged_children:
+            for email in users_by_age[child.age]:
+                if email != parent.email:
+                    results[email].setdefault(parent, []).append(child)
+
+        return results
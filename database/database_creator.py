@@ -1,20 +1,56 @@
+import multiprocessing
+import os
 import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select, insert, update, delete, or_, func, inspect
 
 from data_importer.csv_importer import CSVImporter
+from data_importer.deduplicator import Deduplicator, \
+    PreparedUsersDeduplicator
 from data_importer.json_importer import JsonImporter
+from data_importer.records import normalize_many, validate_many
 from data_importer.xml_importer import XMLImporter
-from database.models import User, Child, Role
-from utils.exceptions import InvalidInputError, RoleNotFoundError
-from utils.helpers import normalize_telephone_num, get_file_extension
-from utils.security import ADMIN_ROLE_NAME
+from database.models import User, Child, Role, ImportedFile, \
+    ChildrenAgeStats, MAX_IN_CLAUSE_PARAMS
+from utils.exceptions import RoleNotFoundError
+from utils.helpers import normalize_telephone_num, get_file_extension, \
+    chunked, get_file_hash
+from utils.security import ADMIN_ROLE_NAME, generate_password_hash
+from utils.validators import validate_email, validate_telephone_number
+
+# batch size used by bulk imports if none was given
+DEFAULT_BATCH_SIZE = 10000
+# number of prepared chunks (per worker) the workers of the parallel
+# import may queue ahead of the process writing to the database
+QUEUED_CHUNKS = 2
 
 
 class DatabaseCreator:
-    def __init__(self, session):
+    def __init__(self, session, batch_size=None, stream=False, jobs=1,
+                 auth_cache=None):
+        """
+        :param session: SQLAlchemy session
+        :param batch_size: number of users imported within a single
+        transaction (DEFAULT_BATCH_SIZE if not given)
+        :param stream: if True, files are read record by record
+        and fed to the database as they are read (duplicates are resolved
+        in the database only), so that memory usage doesn't depend
+        on the size of imported files.
+        :param jobs: number of worker processes loading and validating
+        files (see: feed_files_in_parallel)
+        :param auth_cache: AuthenticationCache, from which replaced users
+        are removed
+        """
         self.session = session
+        self.batch_size = batch_size
+        self.stream = stream
+        self.jobs = jobs
+        self.auth_cache = auth_cache
+        self._role_ids = {}
         self.insert_roles()
 
     def insert_roles(self):
@@ -28,78 +64,280 @@ class DatabaseCreator:
                 role.default = (role.name == default_role)
             self.session.add(role)
         self.session.commit()
+        self._role_ids = {
+            role.name: role.role_id for role in self.session.query(Role)
+        }
 
-    @staticmethod
-    def _add_children(children, parent):
-        """
-        Helper to 'add_user_with_children'. Changes must be committed
-        outside this method.
-        """
-        for child in children:
-            Child(
-                name=child["name"],
-                age=child["age"],
-                parent=parent
-            )
-
-    def add_user_with_children(self, user):
-        role = self.session.query(Role).filter_by(name=user["role"]).first()
-        if role is None:
-            raise RoleNotFoundError(f"Role {user['role']} was not found.")
-
-        new_user = User(
-            email=user["email"],
-            firstname=user["firstname"],
-            telephone_number=normalize_telephone_num(
-                user["telephone_number"]),
-            password=user["password"],
-            role=role,
-            created_at=datetime.fromisoformat(user["created_at"])
-        )
-        self._add_children(user["children"], parent=new_user)
-        self.session.add(new_user)
-        self.session.commit()
+    def _update_age_stats(self, age_deltas):
+        """
+        Apply changes in the number of children to the 'children_age_stats'
+        table. Changes must be committed outside this method.
+        :param age_deltas: dict {age: number of added (positive)
+        or removed (negative) children}
+        """
+        table = ChildrenAgeStats.__table__
+        for age, delta in age_deltas.items():
+            if not delta:
+                continue
+            result = self.session.execute(
+                update(table).where(table.c.age == age).values(
+                    children_number=table.c.children_number + delta))
+            if not result.rowcount and delta > 0:
+                self.session.execute(
+                    insert(table).values(age=age, children_number=delta))
+        self.session.execute(
+            delete(table).where(table.c.children_number <= 0))
+
+    def _get_children_ages(self, emails):
+        """
+        :return: Counter {age: number of children} of the given users
+        """
+        ages = Counter()
+        for email_chunk in chunked(emails, MAX_IN_CLAUSE_PARAMS):
+            query = select(Child.age, func.count(Child.child_id)) \
+                .where(Child.parent_id.in_(email_chunk)) \
+                .group_by(Child.age)
+            ages.update(dict(self.session.execute(query).all()))
+        return ages
 
-    def _swap_users_conditionally(self, user):
-        """
-        Add a user (or keep already existing) with a newer creation date
-        to the database.
-        """
-        # this method is called if IntegrityError occurs,
-        # which (in this scenario) is raised when unique constraint
-        # fails -> so that we have to query using all fields
-        # with unique constraint imposed on them:
-        user_query = self.session.query(User)
-        normalized_tel_num = normalize_telephone_num(user["telephone_number"])
-        user_in_db = (
-                user_query.filter_by(email=user["email"]).first()
-                or
-                user_query.filter_by(
-                    telephone_number=normalized_tel_num).first()
-        )
-
-        if datetime.fromisoformat(user["created_at"]) > user_in_db.created_at:
-            self.session.delete(user_in_db)
+    def _ensure_age_stats(self):
+        """
+        Build the statistics of a database created before they were
+        introduced (without the 'children_age_stats' table, or with
+        an empty one created along with the schema), so that changes are
+        applied to complete statistics.
+        """
+        table = ChildrenAgeStats.__table__
+        if not inspect(self.session.connection()).has_table(table.name):
+            self.rebuild_age_stats()
+            return
+        stats_empty = self.session.execute(
+            select(table.c.age).limit(1)).first() is None
+        if stats_empty and self.session.execute(
+                select(Child.child_id).limit(1)).first() is not None:
+            self.rebuild_age_stats()
+
+    def rebuild_age_stats(self):
+        """
+        Compare the 'children_age_stats' table (creating it if missing)
+        with the 'children' table and rebuild it if they are inconsistent.
+        :return: True if the stored statistics were consistent
+        """
+        table = ChildrenAgeStats.__table__
+        table.create(self.session.connection(), checkfirst=True)
+        children_ages = dict(self.session.execute(
+            select(Child.age, func.count(Child.child_id))
+            .group_by(Child.age)).all())
+        stored_ages = dict(self.session.execute(
+            select(table.c.age, table.c.children_number)).all())
+        if children_ages == stored_ages:
             self.session.commit()
-            self.add_user_with_children(user)
+            return True
+
+        self.session.execute(delete(table))
+        if children_ages:
+            self.session.execute(insert(table), [
+                {"age": age, "children_number": children_number}
+                for age, children_number in children_ages.items()
+            ])
+        self.session.commit()
+        return False
+
+    def _invalidate_cached_credentials(self, email, telephone_number):
+        if self.auth_cache is not None:
+            self.auth_cache.invalidate_user(email, telephone_number)
+
+    @staticmethod
+    def _warn_invalid_input(user):
+        print("Warning: skipping invalid input "
+              f"(email or phone number): user {user.firstname}",
+              file=sys.stderr)
 
     def feed_data(self, users):
         """
-        Import data into a database.
-        :param users: list of dictionaries with user-data (returned by
+        Import data into a database using bulk inserts, with one
+        transaction per batch of 'batch_size' users. Rows are inserted
+        with Core statements, without building ORM objects.
+        :param users: iterable of UserRecords (returned by
         data_importer)
         """
-        for user in users:
-            try:
-                self.add_user_with_children(user)
-            except IntegrityError:
-                self.session.rollback()
-                self._swap_users_conditionally(user)
-            except InvalidInputError:
-                print("Warning: rolling back on invalid input "
-                      f"(email or phone number): user {user['firstname']}",
-                      file=sys.stderr)
-                self.session.rollback()
+        self.feed_prepared_users(self._prepare_users(users))
+
+    @staticmethod
+    def prepare_user(user, role_ids, validate=True):
+        """
+        Validate and convert user data into rows for the 'users' and
+        'children' tables.
+        :param role_ids: dict {role name: role id}
+        :param validate: if False, the telephone number is expected to be
+        already normalized and validated (together with the email)
+        :return: tuple (user row, list of children rows)
+        """
+        role_id = role_ids.get(user.role)
+        if role_id is None:
+            raise RoleNotFoundError(f"Role {user.role} was not found.")
+
+        telephone_number = user.telephone_number
+        if validate:
+            telephone_number = normalize_telephone_num(telephone_number)
+            validate_email(user.email)
+            validate_telephone_number(telephone_number)
+        user_row = {
+            "email": user.email,
+            "firstname": user.firstname,
+            "telephone_number": telephone_number,
+            "password_hash": generate_password_hash(user.password),
+            "role_id": role_id,
+            "created_at": datetime.fromisoformat(user.created_at)
+        }
+        children_rows = [
+            {
+                "parent_id": user.email,
+                "name": child.name,
+                "age": child.age
+            } for child in user.children
+        ]
+        return user_row, children_rows
+
+    def _prepare_users(self, users):
+        for batch in chunked(users, self.batch_size or DEFAULT_BATCH_SIZE):
+            prepared_users, invalid_users = prepare_users(
+                batch, self._role_ids)
+            for user in invalid_users:
+                self._warn_invalid_input(user)
+            yield from prepared_users
+
+    def _get_conflicting_users(self, user_rows):
+        """
+        Fetch users already stored in the database, whose email or
+        telephone number is shared with any of the given rows.
+        """
+        emails = [row["email"] for row in user_rows]
+        phone_nums = [row["telephone_number"] for row in user_rows]
+        conflicting = {}
+        for email_chunk, phone_chunk in zip(
+                chunked(emails, MAX_IN_CLAUSE_PARAMS),
+                chunked(phone_nums, MAX_IN_CLAUSE_PARAMS)):
+            query = select(
+                User.email, User.telephone_number, User.created_at
+            ).where(or_(User.email.in_(email_chunk),
+                        User.telephone_number.in_(phone_chunk)))
+            for row in self.session.execute(query).mappings():
+                conflicting[row["email"]] = dict(row)
+        return conflicting.values()
+
+    def _merge_batch(self, prepared_users):
+        """
+        Resolve duplicates (by email or telephone number) within the batch
+        and against the database: the newer entry wins, on equal
+        timestamps the one imported first is kept.
+        :param prepared_users: list of tuples returned by 'prepare_user'
+        :return: tuple (prepared users to insert, rows of users to be
+        deleted from the database)
+        """
+        by_email = {}
+        by_phone = {}
+
+        def index(entry):
+            user_row = entry[0]
+            by_email[user_row["email"]] = entry
+            by_phone[user_row["telephone_number"]] = entry
+
+        def evict(entry):
+            user_row = entry[0]
+            del by_email[user_row["email"]]
+            del by_phone[user_row["telephone_number"]]
+
+        stored_users = self._get_conflicting_users(
+            [user_row for user_row, _ in prepared_users])
+        for user_row in stored_users:
+            index((user_row, None))
+
+        users_to_delete = []
+        for entry in prepared_users:
+            user_row = entry[0]
+            conflicts = {
+                id(conflict): conflict for conflict in (
+                    by_email.get(user_row["email"]),
+                    by_phone.get(user_row["telephone_number"])
+                ) if conflict is not None
+            }.values()
+            if any(conflict[0]["created_at"] >= user_row["created_at"]
+                   for conflict in conflicts):
+                continue
+            for conflict in conflicts:
+                evict(conflict)
+                if conflict[1] is None:  # already stored in the database
+                    users_to_delete.append(conflict[0])
+            index(entry)
+
+        users_to_insert = [
+            entry for entry in by_email.values() if entry[1] is not None
+        ]
+        return users_to_insert, users_to_delete
+
+    def _delete_users(self, user_rows):
+        for user_row in user_rows:
+            self._invalidate_cached_credentials(
+                user_row["email"], user_row["telephone_number"])
+        emails = [user_row["email"] for user_row in user_rows]
+        removed_ages = self._get_children_ages(emails)
+        self._update_age_stats(
+            {age: -number for age, number in removed_ages.items()})
+        for email_chunk in chunked(emails, MAX_IN_CLAUSE_PARAMS):
+            self.session.execute(delete(Child.__table__).where(
+                Child.__table__.c.parent_id.in_(email_chunk)))
+            self.session.execute(delete(User.__table__).where(
+                User.__table__.c.email.in_(email_chunk)))
+
+    def _write_batch(self, prepared_users):
+        """
+        Write a single batch of users within one transaction.
+        :param prepared_users: list of tuples returned by 'prepare_user'
+        :return: tuple (number of inserted users, number of inserted
+        children)
+        """
+        users_to_insert, users_to_delete = self._merge_batch(prepared_users)
+        user_rows = [user_row for user_row, _ in users_to_insert]
+        children_rows = [child_row for _, children_rows in users_to_insert
+                         for child_row in children_rows]
+        try:
+            self._delete_users(users_to_delete)
+            if user_rows:
+                self.session.execute(insert(User.__table__), user_rows)
+            if children_rows:
+                self.session.execute(insert(Child.__table__), children_rows)
+            self._update_age_stats(
+                Counter(child_row["age"] for child_row in children_rows))
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        return len(user_rows), len(children_rows)
+
+    def feed_prepared_users(self, prepared_users):
+        """
+        Import already validated users into a database using bulk inserts,
+        with one transaction per batch of 'batch_size' users.
+        :param prepared_users: iterable of tuples returned by
+        'prepare_user'
+        """
+        self._ensure_age_stats()
+        users_count = children_count = 0
+        start_time = time.perf_counter()
+        for batch in chunked(prepared_users,
+                             self.batch_size or DEFAULT_BATCH_SIZE):
+            inserted_users, inserted_children = self._write_batch(batch)
+            users_count += inserted_users
+            children_count += inserted_children
+        elapsed_time = time.perf_counter() - start_time
+
+        rows_per_second = (users_count + children_count) / (
+                elapsed_time or float("inf"))
+        print(f"Imported {users_count} users and {children_count} "
+              f"children in {elapsed_time:.2f}s "
+              f"({rows_per_second:.0f} rows/s)", file=sys.stderr)
 
     @staticmethod
     def get_importer_for_file(filename):
@@ -121,20 +359,245 @@ class DatabaseCreator:
                     "Unknown file type: "
                     "can only import data from csv, json or xml files.")
 
-    def import_data_from_file(self, filename):
+    @staticmethod
+    def _report_load_error(filename, fail_reason):
+        print(f"Data import error:\n"
+              f"File: {filename}\n"
+              f"Reason message: {fail_reason}",
+              file=sys.stderr)
+
+    def load_file(self, filename):
+        """
+        :return: loaded data importer or None if loading failed.
+        """
         Importer = self.get_importer_for_file(filename)
-        importer = Importer(filename)
+        importer = Importer(filename, stream=self.stream)
         if importer.is_loaded:
-            self.feed_data(importer)
-        else:
-            print(f"Data import error:\n"
-                  f"File: {filename}\n"
-                  f"Reason message: {importer.fail_reason}",
-                  file=sys.stderr)
+            return importer
+        self._report_load_error(filename, importer.fail_reason)
+        return None
+
+    def import_data_from_file(self, filename):
+        """
+        :return: True if the file was loaded
+        """
+        importer = self.load_file(filename)
+        if importer is None:
+            return False
+        self.feed_data(importer)
+        return True
+
+    def _get_changed_files(self, filenames):
+        """
+        Select files which are new or were modified since they were
+        imported (according to the 'imported_files' table).
+        :return: list of tuples (filename, ImportedFile object - None if
+        the file doesn't exist)
+        """
+        changed_files = []
+        for filename in filenames:
+            path = os.path.abspath(filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # will be reported while loading
+                changed_files.append((filename, None))
+                continue
+
+            imported_file = self.session.get(ImportedFile, path)
+            if (imported_file is not None
+                    and imported_file.size == stat.st_size
+                    and imported_file.modified_at == stat.st_mtime):
+                continue
+            content_hash = get_file_hash(path)
+            if (imported_file is not None
+                    and imported_file.content_hash == content_hash):
+                # touched, but not modified
+                imported_file.modified_at = stat.st_mtime
+                continue
+            changed_files.append((filename, ImportedFile(
+                path=path,
+                size=stat.st_size,
+                modified_at=stat.st_mtime,
+                content_hash=content_hash,
+                imported_at=datetime.now()
+            )))
+        self.session.commit()
+        return changed_files
+
+    def _save_imported_files(self, imported_files):
+        for imported_file in imported_files:
+            if imported_file is not None:
+                self.session.merge(imported_file)
+        self.session.commit()
 
     def feed_files(self, filenames):
         """
+        Import data from new or modified files, with duplicates removed
+        from the merged dataset before it is written to the database
+        (unless in streaming mode). Users from modified files replace
+        stored ones only if they are newer.
         :param filenames: list of data filenames with paths.
         """
+        self._ensure_age_stats()
+        changed_files = self._get_changed_files(filenames)
+        skipped_files_number = len(filenames) - len(changed_files)
+        if skipped_files_number:
+            print(f"Skipping {skipped_files_number} unchanged file(s).",
+                  file=sys.stderr)
+        filenames = [filename for filename, _ in changed_files]
+        loaded_files = set(self._feed_files(filenames))
+        self._save_imported_files(
+            imported_file for filename, imported_file in changed_files
+            if filename in loaded_files)
+
+    def _feed_files(self, filenames):
+        """
+        :return: list of files which were loaded
+        """
+        if self.jobs > 1:
+            return self.feed_files_in_parallel(filenames)
+
+        if self.stream:
+            return [file for file in filenames
+                    if self.import_data_from_file(file)]
+
+        loaded_files = []
+        deduplicator = Deduplicator()
         for file in filenames:
-            self.import_data_from_file(file)
+            importer = self.load_file(file)
+            if importer is not None:
+                deduplicator.add_all(importer)
+                loaded_files.append(file)
+        self.feed_data(deduplicator)
+        return loaded_files
+
+    def feed_files_in_parallel(self, filenames):
+        """
+        Load, validate and normalize files in 'jobs' worker processes,
+        then merge (unless in streaming mode) and write users to
+        the database in this process. In streaming mode users are written
+        in the order in which workers prepared them (so duplicates with
+        equal timestamps from different files may be resolved differently
+        than in a sequential import).
+        :param filenames: list of data filenames with paths.
+        :return: list of files which were loaded
+        """
+        loaded_files = []
+        prepared_chunks = self._prepare_files_in_parallel(
+            filenames, loaded_files)
+        if self.stream:
+            self.feed_prepared_users(
+                user for _, prepared_chunk in prepared_chunks
+                if prepared_chunk is not None for user in prepared_chunk)
+            return loaded_files
+
+        deduplicator = PreparedUsersDeduplicator()
+        for prepared_chunk in self._in_file_order(prepared_chunks):
+            deduplicator.add_all(prepared_chunk)
+        self.feed_prepared_users(deduplicator)
+        return loaded_files
+
+    def _prepare_files_in_parallel(self, filenames, loaded_files):
+        """
+        Helper to 'feed_files_in_parallel': workers pass prepared users
+        in chunks through a single bounded queue, read in the order
+        in which chunks were prepared, so that memory usage doesn't depend
+        on the size of files (unless chunks are held by the caller).
+        :param loaded_files: list, to which loaded files are appended
+        :return: generator of tuples (index of the file, list of prepared
+        users - see: prepare_user), with None instead of the list once
+        the file was read
+        """
+        # the manager is shut down first, which unblocks workers waiting
+        # on the full queue if the generator isn't exhausted
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor, \
+                multiprocessing.Manager() as manager:
+            queue = manager.Queue(QUEUED_CHUNKS * self.jobs)
+            futures = [
+                executor.submit(prepare_file, index, filename,
+                                self._role_ids, queue)
+                for index, filename in enumerate(filenames)
+            ]
+            remaining_files = len(filenames)
+            while remaining_files:
+                index, message = queue.get()
+                if message is not None:
+                    prepared_chunk, invalid_users = message
+                    for user in invalid_users:
+                        self._warn_invalid_input(user)
+                    yield index, prepared_chunk
+                    continue
+
+                remaining_files -= 1
+                # re-raises errors of the worker
+                fail_reason = futures[index].result()
+                if fail_reason:
+                    self._report_load_error(filenames[index], fail_reason)
+                else:
+                    loaded_files.append(filenames[index])
+                yield index, None
+
+    @staticmethod
+    def _in_file_order(prepared_chunks):
+        """
+        Restore the order of files (needed by deduplication, where
+        the user imported first wins on equal timestamps): chunks of a file
+        are held until all preceding files were read.
+        :param prepared_chunks: generator returned by
+        '_prepare_files_in_parallel'
+        :return: generator of lists of prepared users
+        """
+        held_chunks = defaultdict(list)
+        read_files = set()
+        current_file = 0
+        for index, prepared_chunk in prepared_chunks:
+            if prepared_chunk is None:
+                read_files.add(index)
+            else:
+                held_chunks[index].append(prepared_chunk)
+            while True:
+                yield from held_chunks.pop(current_file, [])
+                if current_file not in read_files:
+                    break
+                current_file += 1
+
+
+def prepare_file(index, filename, role_ids, queue):
+    """
+    Load users from a file and prepare them for writing to the database
+    (run by worker processes of the parallel import).
+    :param index: index of the file, sent along with its chunks
+    :param role_ids: dict {role name: role id}
+    :param queue: queue receiving tuples (index, tuple (list of prepared
+    users - see: DatabaseCreator.prepare_user, list of invalid users))
+    for chunks of DEFAULT_BATCH_SIZE users, followed by (index, None)
+    once the file was read (or reading it failed)
+    :return: fail reason if the file wasn't loaded, an empty string
+    otherwise (other errors are raised, as in a sequential import)
+    """
+    try:
+        Importer = DatabaseCreator.get_importer_for_file(filename)
+        importer = Importer(filename, stream=True)
+        if not importer.is_loaded:
+            return importer.fail_reason
+        for batch in chunked(importer, DEFAULT_BATCH_SIZE):
+            queue.put((index, prepare_users(batch, role_ids)))
+        return ""
+    finally:
+        queue.put((index, None))
+
+
+def prepare_users(users, role_ids):
+    """
+    Validate and convert a list of users into database rows.
+    :param role_ids: dict {role name: role id}
+    :return: tuple (list of prepared users - see:
+    DatabaseCreator.prepare_user, list of invalid users)
+    """
+    valid_users, invalid_users = validate_many(normalize_many(users))
+    prepared_users = [
+        DatabaseCreator.prepare_user(user, role_ids, validate=False)
+        for user in valid_users
+    ]
+    return prepared_users, invalid_users
@@ -1,23 +1,77 @@
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship, \
     validates
-from sqlalchemy import (create_engine, Column, String, Integer, Boolean,
-                        DateTime, ForeignKey)
+from sqlalchemy import (create_engine, event, Column, String, Integer,
+                        Boolean, DateTime, ForeignKey, Float, Index)
 
 from utils.security import generate_password_hash, check_password_hash
 from utils.validators import validate_email, validate_telephone_number
 
 Base = declarative_base()
-
-
-def start_engine(engine_url="sqlite:///:memory:"):
+# SQLite limits the number of host parameters in a single statement
+MAX_IN_CLAUSE_PARAMS = 500
+# SQLite pragmas set on every connection, selected per task
+SQLITE_PROFILES = {
+    # create_database: large write transactions; an interrupted import
+    # can be repeated, so only the last transactions may be lost on
+    # power failure (synchronous=NORMAL in WAL mode)
+    "bulk_load": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -256 * 1024,  # in KiB
+        "temp_store": "MEMORY",
+        "mmap_size": 256 * 1024 * 1024
+    },
+    # query tasks: read-only
+    "serving": {
+        "query_only": "ON",
+        "temp_store": "MEMORY",
+        "mmap_size": 256 * 1024 * 1024
+    }
+}
+
+
+def start_engine(engine_url="sqlite:///:memory:", create_schema=True,
+                 profile=None):
+    """
+    :param profile: name of the SQLite performance profile
+    (see: SQLITE_PROFILES), default SQLite settings if not given;
+    the schema can't be created with a read-only profile
+    """
     engine = create_engine(engine_url)
+    if profile is not None:
+        set_sqlite_pragmas(engine, SQLITE_PROFILES[profile])
     Session = sessionmaker(engine)
     session = Session()
-    Base.metadata.create_all(engine)
+    if create_schema:
+        Base.metadata.create_all(engine)
+        create_indexes(engine)
 
     return engine, session
 
 
+def set_sqlite_pragmas(engine, pragmas):
+    """
+    Set pragmas on every new connection of the engine.
+    """
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+        cursor.close()
+
+    event.listen(engine, "connect", set_pragmas)
+
+
+def create_indexes(engine):
+    """
+    Create indexes missing from existing tables (create_all skips
+    tables which already exist).
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
 def drop_all(engine):
     Base.metadata.drop_all(engine)
 
@@ -45,11 +99,15 @@ class User(Base):
                             lazy="dynamic", cascade="all, delete-orphan")
     # hash will be generated using hashlib.sha256().hexdigest
     password_hash = Column(String(64))
-    created_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
 
     def verify_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+    @property
+    def role_name(self):
+        return self.role.name if self.role is not None else None
+
     @property
     def password(self):
         raise AttributeError("Password is not a readable attribute.")
@@ -82,10 +140,52 @@ class Child(Base):
                       nullable=False, autoincrement=True)
     parent_id = Column(String, ForeignKey("users.email"), nullable=False)
     name = Column(String(128), nullable=False)
-    age = Column(Integer, nullable=False, index=True)
-    
+    age = Column(Integer, nullable=False)
+
+    # age -> (parent, name) inverted index; covers similar-age lookups
+    # and grouping children by age
+    __table_args__ = (
+        Index("ix_children_age_parent_id_name", "age", "parent_id", "name"),
+        # parent's children sorted by name; covers 'get_children'
+        Index("ix_children_parent_id_name_age", "parent_id", "name", "age"),
+    )
+
     def __str__(self):
         return f"{self.name}, {self.age}"
 
     def __repr__(self):
         return f"<Child: {self.__str__()}>"
+
+
+class ChildrenAgeStats(Base):
+    """
+    Number of children in each age, maintained by the DatabaseCreator
+    along with the 'children' table (see: DataManager.check_age_stats).
+    """
+    __tablename__ = "children_age_stats"
+
+    age = Column(Integer, primary_key=True, nullable=False,
+                 autoincrement=False)
+    children_number = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<ChildrenAgeStats: {self.age}, {self.children_number}>"
+
+
+class ImportedFile(Base):
+    """
+    Data file imported into the database - used to skip unchanged files
+    on subsequent imports.
+    """
+    __tablename__ = "imported_files"
+
+    path = Column(String, primary_key=True, nullable=False)
+    size = Column(Integer, nullable=False)
+    # modification time, as returned by os.stat
+    modified_at = Column(Float, nullable=False)
+    # hash will be generated using hashlib.sha256().hexdigest
+    content_hash = Column(String(64), nullable=False)
+    imported_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<ImportedFile: {self.path}, {self.content_hash}>"
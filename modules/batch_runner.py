@@ -0,0 +1,142 @@
+"""
+Execution of many tasks (read from a JSONL or CSV file) in one process,
+with a single log-in per user.
+"""
+import csv
+import json
+import sys
+import time
+
+from utils.exceptions import CredentialsError
+from utils.helpers import get_file_extension, chunked
+
+BATCH_FIELDNAMES = ("task", "login", "password")
+# number of requests read (and grouped by user) at once
+REQUESTS_CHUNK_SIZE = 10000
+
+
+def read_batch_file(path):
+    """
+    Read task requests from a JSONL file (one {"task", "login",
+    "password"} object per line) or a CSV file (with a header).
+    :return: generator of tuples (line number, request dict), with
+    ValueError in place of the request dict for malformed lines
+    """
+    file_extension = get_file_extension(path).lower()
+    with open(path, "r", newline="") as file:
+        match file_extension:
+            case ".jsonl":
+                for line_number, line in enumerate(file, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield line_number, json.loads(line)
+                    except ValueError as e:
+                        yield line_number, ValueError(f"invalid JSON: {e}")
+            case ".csv":
+                reader = csv.DictReader(file)
+                for request in reader:
+                    yield reader.line_num, request
+            case _:
+                raise ValueError(
+                    "Unknown file type: "
+                    "can only read tasks from jsonl or csv files.")
+
+
+class BatchRunner:
+    def __init__(self, data_manager, run_task, output_format="text",
+                 rejected_tasks=()):
+        """
+        :param run_task: function executing a task (as script.match_task),
+        called with the task name, the data_manager and the output format
+        :param output_format: output format of all tasks
+        :param rejected_tasks: tasks which can't be executed (e.g. tasks
+        writing to a database opened read-only), reported as errors
+        """
+        self.data_manager = data_manager
+        self.run_task = run_task
+        self.output_format = output_format
+        self.rejected_tasks = rejected_tasks
+
+    @staticmethod
+    def _report_error(line_number, error):
+        print(f"[{line_number}] error: {error}")
+
+    @classmethod
+    def group_by_user(cls, requests):
+        """
+        :param requests: iterable of tuples (line number, request dict)
+        :return: dict {(login, password): list of tuples (line number,
+        task)} in the order of the first appearance of each user;
+        invalid requests are reported and skipped
+        """
+        groups = {}
+        for line_number, request in requests:
+            if isinstance(request, ValueError):
+                cls._report_error(line_number, request)
+                continue
+            if not isinstance(request, dict) or not request.get("task"):
+                cls._report_error(line_number, "missing task")
+                continue
+            task = request["task"]
+            credentials = (request.get("login") or "",
+                           request.get("password") or "")
+            if not all(isinstance(value, str)
+                       for value in (task, *credentials)):
+                cls._report_error(
+                    line_number, "task, login and password must be strings")
+                continue
+            groups.setdefault(credentials, []).append((line_number, task))
+        return groups
+
+    def _run_user_tasks(self, login, password, tasks):
+        login_error = None
+        try:
+            self.data_manager.log_in(login, password)
+        except CredentialsError as e:
+            login_error = e
+        except Exception as e:
+            self.data_manager.session.rollback()
+            login_error = e
+
+        for line_number, task in tasks:
+            print(f"[{line_number}] {task} --login {login}")
+            if task in self.rejected_tasks:
+                self._report_error(
+                    line_number, f"task {task} can't be executed in batch "
+                                 "mode (the database is read-only)")
+                continue
+            try:
+                if login_error is not None:
+                    raise login_error
+                self.run_task(task, self.data_manager, self.output_format)
+            except CredentialsError:
+                print("Invalid Login")
+            except Exception as e:
+                self.data_manager.session.rollback()
+                self._report_error(line_number, f"{type(e).__name__}: {e}")
+        self.data_manager.log_out()
+
+    def run(self, requests):
+        """
+        Execute tasks grouped by user (within chunks of
+        REQUESTS_CHUNK_SIZE requests), printing the output of each task
+        preceded by a '[<line number>] <task> --login <login>' line.
+        Errors are reported as '[<line number>] error: <message>' and
+        don't stop the execution of the remaining tasks.
+        :param requests: iterable of tuples (line number, request dict)
+        :return: number of executed tasks
+        """
+        tasks_number = 0
+        start_time = time.perf_counter()
+        for requests_chunk in chunked(requests, REQUESTS_CHUNK_SIZE):
+            for (login, password), tasks in self.group_by_user(
+                    requests_chunk).items():
+                self._run_user_tasks(login, password, tasks)
+                tasks_number += len(tasks)
+        elapsed_time = time.perf_counter() - start_time
+
+        tasks_per_second = tasks_number / (elapsed_time or float("inf"))
+        print(f"Executed {tasks_number} tasks in {elapsed_time:.2f}s "
+              f"({tasks_per_second:.0f} tasks/s)", file=sys.stderr)
+        return tasks_number
@@ -1,6 +1,52 @@
 """
 Functions for printing data in a desired format.
 """
+import sys
+
+
+class OutputWriter:
+    """
+    Collects output fragments and writes them to the standard output
+    in large blocks - to its binary buffer, if available.
+    """
+
+    def __init__(self, stream=None, chunk_size=64 * 1024):
+        """
+        :param stream: text stream, the current sys.stdout if not given
+        :param chunk_size: number of characters collected before writing
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        self.chunk_size = chunk_size
+        self._fragments = []
+        self._size = 0
+
+    def write(self, text):
+        self._fragments.append(text)
+        self._size += len(text)
+        if self._size >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._fragments:
+            return
+        text = "".join(self._fragments)
+        self._fragments.clear()
+        self._size = 0
+
+        buffer = getattr(self.stream, "buffer", None)
+        if buffer is None:
+            self.stream.write(text)
+            return
+        # text written earlier (e.g. by print) must come first
+        self.stream.flush()
+        buffer.write(text.encode(self.stream.encoding,
+                                 self.stream.errors or "strict"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
 
 
 def print_oldest_account(user):
@@ -10,24 +56,22 @@ def print_oldest_account(user):
 
 
 def print_children_by_age(ages_distribution):
-    for item in ages_distribution:
-        print(f"age: {item['age']}, count: {item['count']}")
+    with OutputWriter() as writer:
+        for age, count in ages_distribution:
+            writer.write(f"age: {age}, count: {count}\n")
 
 
 def print_children(children):
-    for child in children:
-        print(f"{child}")
-
-
-def print_users_children_same_age(data):
-    def _print_children(_children):
-        for i in range(len(_children)):
-            print(f"{str(_children[i])}", end="")
-            (i == len(_children) - 1) or print("; ", end="")
-
-    parents = data.keys()
-    for key in parents:
-        print(f"{str(key)}: ", end="")
-        children = data[key]
-        _print_children(children)
-        print()
+    with OutputWriter() as writer:
+        for child in children:
+            writer.write(f"{child}\n")
+
+
+def print_users_children_same_age(parents_children):
+    """
+    :param parents_children: iterable of tuples (parent, list of children)
+    """
+    with OutputWriter() as writer:
+        for parent, children in parents_children:
+            writer.write(f"{parent}: "
+                         f"{'; '.join(str(child) for child in children)}\n")
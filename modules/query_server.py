@@ -0,0 +1,98 @@
+"""
+Resident server executing tasks with a single, long-living DataManager
+(listening on a Unix-domain socket) and a client forwarding tasks to it.
+Requests and responses are single lines of JSON.
+"""
+import io
+import json
+import os
+import socket
+import socketserver
+from contextlib import redirect_stdout
+
+from utils.exceptions import CredentialsError, QueryServerError
+
+SOCKET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "database", "server.sock")
+
+
+class QueryRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            output = self.server.execute(
+                request["task"], request["login"], request["password"],
+                request.get("format", "text"))
+            response = {"output": output}
+        except Exception as e:
+            response = {"error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class QueryServer(socketserver.UnixStreamServer):
+    def __init__(self, socket_path, data_manager, run_task,
+                 rejected_tasks=()):
+        """
+        :param data_manager: DataManager shared by all requests
+        :param run_task: function executing a task (as script.match_task),
+        called with the task name, the data_manager and the output format
+        :param rejected_tasks: tasks which can't be executed (e.g. tasks
+        writing to a database opened read-only)
+        """
+        self.data_manager = data_manager
+        self.run_task = run_task
+        self.rejected_tasks = rejected_tasks
+        if os.path.exists(socket_path):
+            # left by a server which wasn't shut down properly
+            os.remove(socket_path)
+        super().__init__(socket_path, QueryRequestHandler)
+
+    def execute(self, task, login, password, output_format="text"):
+        """
+        Execute a task on behalf of a user.
+        :param output_format: "text" or one of machine-readable formats
+        :return: printed output of the task
+        """
+        if task in self.rejected_tasks:
+            return (f"Task {task} can't be executed by the query server "
+                    "(the database is read-only).\n")
+        output = io.StringIO()
+        with redirect_stdout(output):
+            try:
+                self.data_manager.log_in(login, password)
+                self.run_task(task, self.data_manager, output_format)
+            except CredentialsError:
+                print("Invalid Login")
+            finally:
+                self.data_manager.log_out()
+                # ends the read transaction, so that the next request
+                # sees the current state of the database
+                self.data_manager.session.rollback()
+        return output.getvalue()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def send_request(task, login, password, socket_path=SOCKET_PATH,
+                 output_format="text"):
+    """
+    Execute a task on the query server.
+    :param output_format: "text" or one of machine-readable formats
+    (see: modules.serializers.FORMATS)
+    :return: printed output of the task
+    """
+    request = {"task": task, "login": login, "password": password,
+               "format": output_format}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        with connection.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode("utf-8") + b"\n")
+            stream.flush()
+            response = json.loads(stream.readline())
+
+    if "error" in response:
+        raise QueryServerError(response["error"])
+    return response["output"]
@@ -0,0 +1,65 @@
+"""
+Machine-readable output of reports: rows of SQLAlchemy results
+(see: DataManager '*_report' methods) serialized as they are fetched.
+"""
+import csv
+import json
+
+from modules.data_printer import OutputWriter
+
+FORMATS = ("json", "jsonl", "csv")
+
+
+def _encode_row(fieldnames, row):
+    # dates are written as in the text output
+    return json.dumps(dict(zip(fieldnames, row)), default=str)
+
+
+def write_json(result, writer):
+    """
+    Write rows as a JSON array of objects.
+    """
+    fieldnames = list(result.keys())
+    separator = "[\n"
+    for row in result:
+        writer.write(separator + _encode_row(fieldnames, row))
+        separator = ",\n"
+    writer.write("[]\n" if separator == "[\n" else "\n]\n")
+
+
+def write_jsonl(result, writer):
+    """
+    Write rows as JSON objects, one per line.
+    """
+    fieldnames = list(result.keys())
+    for row in result:
+        writer.write(_encode_row(fieldnames, row) + "\n")
+
+
+def write_csv(result, writer):
+    """
+    Write rows as CSV with a header.
+    """
+    csv_writer = csv.writer(writer, lineterminator="\n")
+    csv_writer.writerow(result.keys())
+    csv_writer.writerows(result)
+
+
+def serialize(result, output_format, stream=None):
+    """
+    :param result: SQLAlchemy result (or any iterable of rows with
+    a 'keys' method)
+    :param output_format: one of FORMATS
+    :param stream: text stream, the standard output if not given
+    """
+    match output_format:
+        case "json":
+            write = write_json
+        case "jsonl":
+            write = write_jsonl
+        case "csv":
+            write = write_csv
+        case _:
+            raise ValueError(f"Unknown output format: {output_format}.")
+    with OutputWriter(stream) as writer:
+        write(result, writer)
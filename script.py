@@ -3,15 +3,53 @@ import os
 
 from database.data_manager import DataManager
 from modules.data_printer import *
+from modules.batch_runner import BatchRunner, read_batch_file
+from modules.query_server import QueryServer, SOCKET_PATH
+from modules.serializers import serialize, FORMATS
+from utils.auth_cache import AuthenticationCache
 from utils.exceptions import CredentialsError
 
 DATABASE_PATH = os.path.join(
     os.path.dirname(__file__), "database", "users.db")
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+IMPORT_BATCH_SIZE = 10000
+# tasks which write to the database (can't use the read-only profile)
+WRITING_TASKS = ("check-age-stats",)
 
 
-def match_task(user_task, data_manager):
+def match_report(user_task, data_manager):
+    """
+    :return: SQLAlchemy result with the report of a task or None
+    if the task has no report
+    """
+    match user_task:
+        case "print-all-accounts":
+            return data_manager.accounts_report()
+        case "print-oldest-account":
+            return data_manager.oldest_account_report()
+        case "group-by-age":
+            return data_manager.children_by_age_report()
+        case "print-children":
+            return data_manager.children_report()
+        case "find-similar-children-by-age":
+            return data_manager.similar_aged_children_report()
+        case _:
+            return None
+
+
+def match_task(user_task, data_manager, output_format="text"):
+    """
+    :param output_format: "text" or one of machine-readable formats
+    (see: modules.serializers.FORMATS) - used by tasks having a report
+    """
+    report = None
+    if output_format != "text":
+        report = match_report(user_task, data_manager)
+    if report is not None:
+        serialize(report, output_format)
+        return
+
     match user_task:
         case "print-all-accounts":
             number_of_accounts = data_manager.accounts_total_number()
@@ -22,6 +60,12 @@ def match_task(user_task, data_manager):
         case "group-by-age":
             children_by_age = data_manager.group_children_by_age()
             print_children_by_age(children_by_age)
+        case "check-age-stats":
+            if data_manager.check_age_stats():
+                print("Age statistics are consistent.")
+            else:
+                print("Age statistics were inconsistent and have been "
+                      "rebuilt.")
         case "print-children":
             users_children = data_manager.get_children()
             print_children(users_children)
@@ -33,25 +77,87 @@ def match_task(user_task, data_manager):
             print("Unrecognized task.")
 
 
+def serve(data_manager, socket_path, rejected_tasks=()):
+    """
+    Execute tasks sent by clients (client.py) until interrupted.
+    :param rejected_tasks: tasks which can't be executed by the server
+    """
+    with QueryServer(socket_path, data_manager, match_task,
+                     rejected_tasks) as server:
+        print(f"Listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def get_rejected_tasks(profile):
+    """
+    :return: tasks which can't be executed with the profile (by serve
+    and batch, which execute many tasks with one profile)
+    """
+    return WRITING_TASKS if profile == "serving" else ()
+
+
+def get_profile(task, create_schema):
+    """
+    :return: name of the SQLite performance profile for the task
+    (see: database.models.SQLITE_PROFILES)
+    """
+    if task == "create_database":
+        return "bulk_load"
+    if create_schema or task in WRITING_TASKS:
+        return None
+    return "serving"
+
+
 def main(args):
     task = args.task
     login = args.login or ""
     password = args.password or ""
 
-    if (not login or not password) and not task == "create_database":
+    if (not login or not password) \
+            and task not in ("create_database", "serve", "batch"):
         print("Please provide full credentials.")
         exit(1)
 
-    data_manager = DataManager(DATABASE_URL)
-
     if task == "create_database":
+        data_manager = DataManager(DATABASE_URL,
+                                   profile=get_profile(task, True))
         print("Creating database...")
-        data_manager.create_database(DATA_DIR)
+        data_manager.create_database(DATA_DIR, batch_size=args.batch_size,
+                                     stream=args.stream, jobs=args.jobs)
+        exit(0)
+
+    # schema creation is skipped for an existing database
+    create_schema = not os.path.exists(DATABASE_PATH)
+    profile = get_profile(task, create_schema)
+
+    if task == "serve":
+        data_manager = DataManager(DATABASE_URL, create_schema,
+                                   auth_cache=AuthenticationCache(),
+                                   profile=profile)
+        if args.columnar:
+            data_manager.load_columnar_snapshot()
+        serve(data_manager, args.socket, get_rejected_tasks(profile))
+        exit(0)
+
+    data_manager = DataManager(DATABASE_URL, create_schema, profile=profile)
+
+    if task == "batch":
+        if not args.input:
+            print("Please provide a file with tasks (--input).")
+            exit(1)
+        if args.columnar:
+            data_manager.load_columnar_snapshot()
+        BatchRunner(data_manager, match_task, args.format,
+                    get_rejected_tasks(profile)).run(
+            read_batch_file(args.input))
         exit(0)
 
     try:
         data_manager.log_in(login, password)
-        match_task(task, data_manager)
+        match_task(task, data_manager, args.format)
     except CredentialsError:
         print("Invalid Login")
 
@@ -60,6 +166,26 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     for argument in ["task", "--login", "--password"]:
         parser.add_argument(argument)
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE,
+                        help="number of users imported in one transaction "
+                             "by create_database")
+    parser.add_argument("--stream", action="store_true",
+                        help="create_database: read data files record "
+                             "by record instead of loading them at once")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="create_database: number of processes "
+                             "loading and validating data files")
+    parser.add_argument("--socket", default=SOCKET_PATH,
+                        help="serve: path of the query server socket")
+    parser.add_argument("--columnar", action="store_true",
+                        help="serve, batch: compute admin reports from "
+                             "an in-memory snapshot (requires numpy)")
+    parser.add_argument("--format", choices=("text", *FORMATS),
+                        default="text",
+                        help="output format of query tasks")
+    parser.add_argument("--input",
+                        help="batch: jsonl or csv file with task, login "
+                             "and password of each task to execute")
 
     script_args = parser.parse_args()
     main(script_args)
@@ -0,0 +1,60 @@
+import unittest
+
+from utils.auth_cache import AuthenticationCache, CachedCredentials
+from utils.security import generate_password_hash
+
+
+class Clock:
+    def __init__(self):
+        self.time = 0
+
+    def __call__(self):
+        return self.time
+
+
+class AuthenticationCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.cache = AuthenticationCache(max_size=2, ttl=10,
+                                         clock=self.clock)
+        self.credentials = CachedCredentials(
+            "woodsjerry@example.com", "823816375",
+            generate_password_hash("z2Y%0Hbcsi"), "user")
+
+    def test_getting_credentials(self):
+        self.cache.put("823816375", self.credentials)
+        self.assertIs(self.credentials, self.cache.get("823816375"))
+        self.assertIsNone(self.cache.get("woodsjerry@example.com"))
+
+    def test_expiration(self):
+        self.cache.put("823816375", self.credentials)
+        self.clock.time = 10
+        self.assertIsNone(self.cache.get("823816375"))
+        self.assertEqual(0, len(self.cache))
+
+    def test_evicting_least_recently_used(self):
+        self.cache.put("a@example.com", self.credentials)
+        self.cache.put("b@example.com", self.credentials)
+        self.cache.get("a@example.com")
+        self.cache.put("c@example.com", self.credentials)
+
+        self.assertIsNotNone(self.cache.get("a@example.com"))
+        self.assertIsNone(self.cache.get("b@example.com"))
+        self.assertEqual(2, len(self.cache))
+
+    def test_invalidating_user(self):
+        """
+        Credentials are removed for both logins: email and phone number.
+        """
+        self.cache.put("823816375", self.credentials)
+        self.cache.put("woodsjerry@example.com", self.credentials)
+        self.cache.invalidate_user("woodsjerry@example.com", "823816375")
+        self.assertEqual(0, len(self.cache))
+
+    def test_verifying_password(self):
+        self.assertTrue(self.credentials.verify_password("z2Y%0Hbcsi"))
+        self.assertFalse(self.credentials.verify_password("wrong_password"))
+
+
+if __name__ == '__main__':
+    unittest.main()
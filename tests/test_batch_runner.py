@@ -0,0 +1,245 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from unittest import mock
+
+from database.data_manager import DataManager
+from modules.batch_runner import BatchRunner, read_batch_file
+from script import match_task
+from tests.test_data_manager import TestData
+
+
+class ReadBatchFileTestCase(unittest.TestCase):
+    requests = [
+        {"task": "print-children", "login": "opoole@example.org",
+         "password": "+3t)mSM6xX"},
+        {"task": "group-by-age", "login": "823816375",
+         "password": "z2Y%0Hbcsi"}
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write_file(self, filename, content):
+        path = os.path.join(self.directory, filename)
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    def test_reading_jsonl(self):
+        content = "\n".join(json.dumps(request) for request in self.requests)
+        path = self._write_file("tasks.jsonl", content + "\n\n")
+        result = list(read_batch_file(path))
+        self.assertListEqual(list(enumerate(self.requests, start=1)), result)
+
+    def test_reading_csv(self):
+        content = ("task,login,password\n"
+                   "print-children,opoole@example.org,+3t)mSM6xX\n"
+                   "group-by-age,823816375,z2Y%0Hbcsi\n")
+        path = self._write_file("tasks.csv", content)
+        result = list(read_batch_file(path))
+        self.assertListEqual(list(enumerate(self.requests, start=2)), result)
+
+    def test_malformed_jsonl_line(self):
+        content = ("{not json}\n" + json.dumps(self.requests[0]) + "\n")
+        path = self._write_file("tasks.jsonl", content)
+        result = list(read_batch_file(path))
+
+        self.assertIsInstance(result[0][1], ValueError)
+        self.assertEqual((2, self.requests[0]), result[1])
+
+    def test_unknown_file_type(self):
+        path = self._write_file("tasks.txt", "")
+        self.assertRaises(ValueError, lambda: list(read_batch_file(path)))
+
+
+class BatchRunnerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.data_manager = DataManager("sqlite:///:memory:")
+        self.data_manager.database_creator.feed_data(TestData.users)
+        self.batch_runner = BatchRunner(self.data_manager, match_task)
+
+    def _run(self, requests):
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(io.StringIO()):
+            self.batch_runner.run(enumerate(requests, start=1))
+        return output.getvalue()
+
+    def test_grouping_by_user(self):
+        requests = [
+            ("print-children", "opoole@example.org", "+3t)mSM6xX"),
+            ("print-children", "823816375", "z2Y%0Hbcsi"),
+            ("print-all-accounts", "opoole@example.org", "+3t)mSM6xX")
+        ]
+        groups = BatchRunner.group_by_user(
+            (line_number, dict(zip(("task", "login", "password"), request)))
+            for line_number, request in enumerate(requests, start=1))
+        expected_groups = {
+            ("opoole@example.org", "+3t)mSM6xX"): [
+                (1, "print-children"), (3, "print-all-accounts")],
+            ("823816375", "z2Y%0Hbcsi"): [(2, "print-children")]
+        }
+        self.assertDictEqual(expected_groups, groups)
+
+    def test_logging_in_once_per_user(self):
+        requests = [
+            {"task": "print-children", "login": "opoole@example.org",
+             "password": "+3t)mSM6xX"},
+            {"task": "print-all-accounts", "login": "opoole@example.org",
+             "password": "+3t)mSM6xX"}
+        ]
+        with mock.patch.object(self.data_manager, "log_in",
+                               wraps=self.data_manager.log_in) as log_in:
+            output = self._run(requests)
+
+        log_in.assert_called_once_with("opoole@example.org", "+3t)mSM6xX")
+        expected_output = ("[1] print-children --login opoole@example.org\n"
+                           "George, 8\nMarie, 17\nSusan, 14\n"
+                           "[2] print-all-accounts --login "
+                           "opoole@example.org\n"
+                           "2\n")
+        self.assertEqual(expected_output, output)
+
+    def test_invalid_credentials(self):
+        requests = [
+            {"task": "print-children", "login": "opoole@example.org",
+             "password": "wrong_password"},
+            {"task": "print-all-accounts", "login": "823816375",
+             "password": "z2Y%0Hbcsi"}
+        ]
+        expected_output = ("[1] print-children --login opoole@example.org\n"
+                           "Invalid Login\n"
+                           "[2] print-all-accounts --login 823816375\n"
+                           "Invalid Login\n")
+        self.assertEqual(expected_output, self._run(requests))
+
+    def test_errors_reported_per_line(self):
+        """
+        Invalid requests and failing tasks don't stop the batch.
+        """
+        def run_task(task, data_manager, output_format):
+            if task == "failing-task":
+                raise RuntimeError("task failed")
+            match_task(task, data_manager, output_format)
+
+        self.batch_runner.run_task = run_task
+        requests = [
+            ValueError("invalid JSON"),
+            {"task": "failing-task", "login": "823816375",
+             "password": "z2Y%0Hbcsi"},
+            {"login": "823816375", "password": "z2Y%0Hbcsi"},
+            {"task": "print-children", "login": "823816375",
+             "password": "z2Y%0Hbcsi"}
+        ]
+        expected_output = ("[1] error: invalid JSON\n"
+                           "[3] error: missing task\n"
+                           "[2] failing-task --login 823816375\n"
+                           "[2] error: RuntimeError: task failed\n"
+                           "[4] print-children --login 823816375\n"
+                           "Angela, 14\nMichael, 17\n")
+        self.assertEqual(expected_output, self._run(requests))
+
+    def test_requests_with_invalid_types(self):
+        requests = [
+            {"task": "print-children", "login": 123,
+             "password": "z2Y%0Hbcsi"},
+            {"task": "print-children", "login": ["823816375"],
+             "password": "z2Y%0Hbcsi"},
+            {"task": ["print-children"], "login": "823816375",
+             "password": "z2Y%0Hbcsi"},
+            {"task": "print-children", "login": "823816375",
+             "password": "z2Y%0Hbcsi"}
+        ]
+        expected_output = ("[1] error: task, login and password must be "
+                           "strings\n"
+                           "[2] error: task, login and password must be "
+                           "strings\n"
+                           "[3] error: task, login and password must be "
+                           "strings\n"
+                           "[4] print-children --login 823816375\n"
+                           "Angela, 14\nMichael, 17\n")
+        self.assertEqual(expected_output, self._run(requests))
+
+    def test_log_in_errors_reported_per_line(self):
+        requests = [
+            {"task": "print-children", "login": "opoole@example.org",
+             "password": "+3t)mSM6xX"},
+            {"task": "print-all-accounts", "login": "opoole@example.org",
+             "password": "+3t)mSM6xX"},
+            {"task": "print-children", "login": "823816375",
+             "password": "z2Y%0Hbcsi"}
+        ]
+        log_in = self.data_manager.log_in
+
+        def failing_log_in(login, password):
+            if login == "opoole@example.org":
+                raise RuntimeError("log-in failed")
+            log_in(login, password)
+
+        with mock.patch.object(self.data_manager, "log_in", failing_log_in):
+            output = self._run(requests)
+
+        expected_output = ("[1] print-children --login opoole@example.org\n"
+                           "[1] error: RuntimeError: log-in failed\n"
+                           "[2] print-all-accounts --login "
+                           "opoole@example.org\n"
+                           "[2] error: RuntimeError: log-in failed\n"
+                           "[3] print-children --login 823816375\n"
+                           "Angela, 14\nMichael, 17\n")
+        self.assertEqual(expected_output, output)
+
+    def test_rejected_tasks(self):
+        self.batch_runner.rejected_tasks = ("check-age-stats",)
+        requests = [
+            {"task": "check-age-stats", "login": "opoole@example.org",
+             "password": "+3t)mSM6xX"},
+            {"task": "print-all-accounts", "login": "opoole@example.org",
+             "password": "+3t)mSM6xX"}
+        ]
+        expected_output = (
+            "[1] check-age-stats --login opoole@example.org\n"
+            "[1] error: task check-age-stats can't be executed in batch "
+            "mode (the database is read-only)\n"
+            "[2] print-all-accounts --login opoole@example.org\n"
+            "2\n")
+        self.assertEqual(expected_output, self._run(requests))
+
+    def test_output_format(self):
+        self.batch_runner.output_format = "jsonl"
+        requests = [{"task": "print-children", "login": "823816375",
+                     "password": "z2Y%0Hbcsi"}]
+        expected_output = ("[1] print-children --login 823816375\n"
+                           '{"name": "Angela", "age": 14}\n'
+                           '{"name": "Michael", "age": 17}\n')
+        self.assertEqual(expected_output, self._run(requests))
+
+    def test_grouping_within_chunks(self):
+        requests = [
+            {"task": "print-all-accounts", "login": "opoole@example.org",
+             "password": "+3t)mSM6xX"},
+            {"task": "print-children", "login": "823816375",
+             "password": "z2Y%0Hbcsi"},
+            {"task": "print-all-accounts", "login": "opoole@example.org",
+             "password": "+3t)mSM6xX"}
+        ]
+        with mock.patch("modules.batch_runner.REQUESTS_CHUNK_SIZE", 2):
+            output = self._run(requests)
+
+        headers = [line for line in output.splitlines()
+                   if line.startswith("[")]
+        self.assertListEqual(
+            ["[1] print-all-accounts --login opoole@example.org",
+             "[2] print-children --login 823816375",
+             "[3] print-all-accounts --login opoole@example.org"],
+            headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
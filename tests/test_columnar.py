@@ -0,0 +1,70 @@
+import unittest
+
+from database.columnar import np
+from database.data_manager import DataManager
+from database.models import User, drop_all
+from tests.test_data_manager import TestData
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class ColumnarSnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.data_manager = DataManager("sqlite:///:memory:")
+        self.data_manager.database_creator.feed_data(TestData.users)
+        self.data_manager.log_in("opoole@example.org", "+3t)mSM6xX")
+
+    def tearDown(self):
+        drop_all(self.data_manager.engine)
+
+    def test_accounts_total_number(self):
+        expected_result = self.data_manager.accounts_total_number()
+        self.data_manager.load_columnar_snapshot()
+        self.assertEqual(expected_result,
+                         self.data_manager.accounts_total_number())
+
+    def test_role_ids(self):
+        self.data_manager.load_columnar_snapshot()
+        snapshot = self.data_manager.columnar_snapshot
+        role_ids = {user.email: user.role_id
+                    for user in self.data_manager.session.query(User)}
+        self.assertListEqual([role_ids[email] for email in snapshot.emails],
+                             snapshot.role_ids.tolist())
+
+    def test_parent_indices(self):
+        self.data_manager.load_columnar_snapshot()
+        snapshot = self.data_manager.columnar_snapshot
+        parents = snapshot.emails[snapshot.parent_indices]
+        self.assertListEqual(["opoole@example.org"] * 3
+                             + ["woodsjerry@example.com"] * 2,
+                             sorted(parents.tolist()))
+
+    def test_same_number_of_accounts_in_all_formats(self):
+        """
+        Text and machine-readable reports read the same snapshot, even
+        if the database changed after it was loaded.
+        """
+        self.data_manager.load_columnar_snapshot()
+        self.data_manager.database_creator.feed_data(
+            [TestData.users[0]._replace(email="new@example.com",
+                                        telephone_number="111222333")])
+        report = self.data_manager.accounts_report().mappings().one()
+
+        self.assertEqual(2, self.data_manager.accounts_total_number())
+        self.assertEqual(2, report["accounts"])
+
+    def test_empty_database(self):
+        data_manager = DataManager("sqlite:///:memory:")
+        data_manager.load_columnar_snapshot()
+        snapshot = data_manager.columnar_snapshot
+        self.assertEqual(0, snapshot.accounts_total_number())
+        self.assertEqual(0, len(snapshot.role_ids))
+
+    def test_dropping_snapshot_on_create_database(self):
+        data_manager = DataManager("sqlite:///:memory:")
+        data_manager.load_columnar_snapshot()
+        data_manager.create_database("./test_data/a")
+        self.assertIsNone(data_manager.columnar_snapshot)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,11 @@
+import io
+import json
 import unittest
+from collections.abc import Generator
 
 from data_importer.csv_importer import CSVImporter
 from data_importer.json_importer import JsonImporter
+from data_importer.records import UserRecord
 from data_importer.xml_importer import XMLImporter
 
 
@@ -9,19 +13,20 @@ class DataImporterTestCaseAbs:
     Importer = None
     importer = None
     user_data = None
+    stream = False
 
     @classmethod
     def setup_importer(cls, test_data_path):
-        cls.importer = cls.Importer(test_data_path)
+        cls.importer = cls.Importer(test_data_path, stream=cls.stream)
         if cls.importer.is_loaded:
             cls.user_data = list(cls.importer)
 
     def test_imported_data_types(self):
         """
-        Class imports data into Python list format composed of dicts.
+        Class imports data into Python list format composed of UserRecords.
         """
         self.assertIs(type(self.user_data), list)
-        self.assertIs(type(self.user_data[0]), dict)
+        self.assertIs(type(self.user_data[0]), UserRecord)
 
     def test_import_length(self):
         """
@@ -33,7 +38,7 @@ class DataImporterTestCaseAbs:
         self.assertTrue(self.importer.is_loaded)
 
     def test_import_fail(self):
-        importer = self.Importer("/wrong/path/to/file")
+        importer = self.Importer("/wrong/path/to/file", stream=self.stream)
         self.assertFalse(importer.is_loaded)
         self.assertIn("No such file or directory", importer.fail_reason)
 
@@ -56,7 +61,8 @@ class DataImporterTestCaseAbs:
                 }
             ]
         }
-        self.assertDictEqual(expected_output, self.user_data[0])
+        self.assertEqual(UserRecord.from_dict(expected_output),
+                         self.user_data[0])
 
 
 class JsonImporterTestCase(unittest.TestCase, DataImporterTestCaseAbs):
@@ -83,5 +89,82 @@ class CSVImporterTestCase(unittest.TestCase, DataImporterTestCaseAbs):
         cls.setup_importer("./test_data/users.csv")
 
 
+class StreamingImporterTestCaseAbs(DataImporterTestCaseAbs):
+    stream = True
+
+    def test_lazy_iteration(self):
+        """
+        In streaming mode data is read while iterating over the importer.
+        """
+        self.assertIsNone(self.importer.converted_data)
+        self.assertIsInstance(iter(self.importer), Generator)
+
+
+class CSVStreamingImporterTestCase(unittest.TestCase,
+                                   StreamingImporterTestCaseAbs):
+    Importer = CSVImporter
+
+    @classmethod
+    def setUpClass(cls):
+        cls.setup_importer("./test_data/users.csv")
+
+
+class JsonStreamingImporterTestCase(unittest.TestCase,
+                                    StreamingImporterTestCaseAbs):
+    Importer = JsonImporter
+
+    @classmethod
+    def setUpClass(cls):
+        cls.setup_importer("./test_data/users.json")
+
+    def _decode(self, text, read_size=3):
+        importer = JsonImporter("./test_data/users.json", stream=True)
+        importer.read_size = read_size
+        return list(importer.iter_items(io.StringIO(text)))
+
+    def test_items_split_between_reads(self):
+        """
+        Decoded items are equal to those loaded at once, regardless
+        of how the file is split into chunks.
+        """
+        with open("./test_data/users.json") as file:
+            text = file.read()
+        expected_output = json.loads(text)
+        for read_size in (1, 7, 64):
+            with self.subTest(read_size=read_size):
+                self.assertListEqual(expected_output,
+                                     self._decode(text, read_size))
+
+    def test_numbers_split_between_reads(self):
+        self.assertListEqual([123, 4.5], self._decode(" [123 , 4.5]\n"))
+
+    def test_empty_array(self):
+        self.assertListEqual([], self._decode(" [ ] "))
+
+    def test_malformed_input(self):
+        for text in ("", "{}", "[{}", "[{},]", "[1] 2", "[{\"a\": }]"):
+            with self.subTest(text=text):
+                self.assertRaises(json.JSONDecodeError,
+                                  lambda: self._decode(text))
+
+
+class XMLStreamingImporterTestCase(unittest.TestCase,
+                                   StreamingImporterTestCaseAbs):
+    Importer = XMLImporter
+
+    @classmethod
+    def setUpClass(cls):
+        cls.setup_importer("./test_data/users.xml")
+
+    def test_malformed_input(self):
+        """
+        Invalid entities are skipped, as in the non-streaming mode.
+        """
+        filename = "./test_data/a/file1.xml"
+        expected_output = list(XMLImporter(filename))
+        result = list(XMLImporter(filename, stream=True))
+        self.assertListEqual(expected_output, result)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,13 +1,22 @@
+import io
+import os
+import shutil
+import tempfile
 import unittest
+from contextlib import redirect_stderr
 from unittest import mock
 
+from sqlalchemy import create_engine, delete
+
+from data_importer.records import UserRecord, ChildRecord
 from database.data_manager import DataManager
-from database.models import User, drop_all
+from database.models import User, Child, ChildrenAgeStats, drop_all
+from utils.auth_cache import AuthenticationCache
 from utils.exceptions import InvalidCredentialsError, AuthorizationError
 
 
 class TestData:
-    users = [
+    users = [UserRecord.from_dict(user) for user in [
         {
             "firstname": "Patricia",
             "telephone_number": "823816375",
@@ -58,7 +67,7 @@ class TestData:
             "created_at": "2023-04-02 15:57:34",
             "children": []
         }
-    ]
+    ]]
 
 
 class CreateDatabaseTestCase(unittest.TestCase):
@@ -121,23 +130,25 @@ class TasksTestCase(unittest.TestCase):
                          str(oldest_user_account.created_at))
 
     def test_group_children_by_age(self):
-        expected_output = [
-            {
-                "age": 8,
-                "count": 1
-            },
-            {
-                "age": 14,
-                "count": 2
-            },
-            {
-                "age": 17,
-                "count": 2
-            }
-        ]
+        expected_output = [(8, 1), (14, 2), (17, 2)]
         result = self.data_manager.group_children_by_age()
         self.assertListEqual(expected_output, result)
 
+    def test_group_children_by_age_without_stats_table(self):
+        """
+        Databases created before the statistics were introduced lack
+        the 'children_age_stats' table.
+        """
+        ChildrenAgeStats.__table__.drop(self.data_manager.engine)
+        with redirect_stderr(io.StringIO()):
+            result = self.data_manager.group_children_by_age()
+            report = self.data_manager.children_by_age_report().all()
+        self.assertListEqual([(8, 1), (14, 2), (17, 2)], result)
+        self.assertListEqual(result, [tuple(row) for row in report])
+
+    def test_check_age_stats(self):
+        self.assertTrue(self.data_manager.check_age_stats())
+
     def test_get_children(self):
         """
         Getting user's children. Children must be sorted alphabetically.
@@ -151,15 +162,84 @@ class TasksTestCase(unittest.TestCase):
         self.data_manager.log_out()
         self.data_manager.log_in("woodsjerry@example.com",
                                  "z2Y%0Hbcsi")
-        users = self.data_manager.users_w_similar_aged_children()
-        user_key = list(users.keys())[0]
+        users = list(self.data_manager.users_w_similar_aged_children())
+        user_key, children = users[0]
 
         # roughly testing the desired behaviour
         self.assertEqual(user_key.firstname, "Justin")
-        self.assertEqual(1, len(users.keys()))
-        self.assertEqual(2, len(users[user_key]))
-        self.assertEqual(str(users[user_key][0]), "Marie, 17")
-        self.assertEqual(str(users[user_key][1]), "Susan, 14")
+        self.assertEqual(1, len(users))
+        self.assertEqual(2, len(children))
+        self.assertEqual(str(children[0]), "Marie, 17")
+        self.assertEqual(str(children[1]), "Susan, 14")
+
+    def test_similar_age_children_for_users(self):
+        emails = ["woodsjerry@example.com", "opoole@example.org",
+                  "unknown@example.com"]
+        results = self.data_manager.similar_aged_children_for_users(emails)
+        result = {
+            email: {parent.email: [str(child) for child in children]
+                    for parent, children in parents_children.items()}
+            for email, parents_children in results.items()
+        }
+        expected_result = {
+            "woodsjerry@example.com": {
+                "opoole@example.org": ["Marie, 17", "Susan, 14"]},
+            "opoole@example.org": {
+                "woodsjerry@example.com": ["Angela, 14", "Michael, 17"]},
+            "unknown@example.com": {}
+        }
+        self.assertDictEqual(expected_result, result)
+
+    def test_similar_age_children_for_single_user(self):
+        """
+        Results for many users are the same as for a logged-in user.
+        """
+        email = "woodsjerry@example.com"
+        results = self.data_manager.similar_aged_children_for_users([email])
+        self.data_manager.log_out()
+        self.data_manager.log_in(email, "z2Y%0Hbcsi")
+        self.assertListEqual(
+            list(results[email].items()),
+            list(self.data_manager.users_w_similar_aged_children()))
+
+    def test_order_of_parents_with_similar_aged_children(self):
+        """
+        Parents come in the order of their first (by name, then by id)
+        matched child, also if other parents' children are interleaved.
+        """
+        users = [
+            TestData.users[0]._replace(
+                email=email, telephone_number=f"11122233{i}",
+                children=[ChildRecord(name, 14) for name in names])
+            for i, (email, names) in enumerate([
+                ("zoe@example.com", ("Zoe", "Amy")),
+                ("yan@example.com", ("Amy", "Bob")),
+                ("xia@example.com", ("Carl",)),
+                ("wes@example.com", ("Bob", "Amy", "Dan"))])
+        ]
+        self.data_manager.database_creator.feed_data(users)
+        results = self.data_manager.similar_aged_children_for_users(
+            ["woodsjerry@example.com"])
+        self.data_manager.log_out()
+        self.data_manager.log_in("woodsjerry@example.com", "z2Y%0Hbcsi")
+        result = [
+            (parent.email, [child.name for child in children])
+            for parent, children
+            in self.data_manager.users_w_similar_aged_children()
+        ]
+        expected_result = [
+            ("zoe@example.com", ["Amy", "Zoe"]),
+            ("yan@example.com", ["Amy", "Bob"]),
+            ("wes@example.com", ["Amy", "Bob", "Dan"]),
+            ("xia@example.com", ["Carl"]),
+            ("opoole@example.org", ["Marie", "Susan"])
+        ]
+        self.assertListEqual(expected_result, result)
+        self.assertListEqual(
+            expected_result,
+            [(parent.email, [child.name for child in children])
+             for parent, children
+             in results["woodsjerry@example.com"].items()])
 
 
 class AuthenticationAuthorizationTestCase(unittest.TestCase):
@@ -216,5 +296,107 @@ class AuthenticationAuthorizationTestCase(unittest.TestCase):
             AuthorizationError, self.data_manager.accounts_total_number)
 
 
+class AuthenticationCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.data_manager = DataManager(
+            "sqlite:///:memory:", auth_cache=AuthenticationCache())
+        self.session = self.data_manager.session
+        self.data_manager.database_creator.feed_data(TestData.users)
+        self.email = "opoole@example.org"
+        self.password = "+3t)mSM6xX"
+        self.data_manager.log_in(self.email, self.password)
+        self.data_manager.log_out()
+
+    def _delete_users(self):
+        self.session.query(Child).delete()
+        self.session.query(User).delete()
+        self.session.commit()
+
+    def test_logging_in_from_cache(self):
+        """
+        Cached user logs in without querying the database.
+        """
+        self._delete_users()
+        self.data_manager.log_in(self.email, self.password)
+        self.assertEqual(self.email,
+                         self.data_manager._authenticated_user.email)
+
+    def test_admin_task_logged_in_from_cache(self):
+        self.data_manager.log_in(self.email, self.password)
+        self.assertEqual(2, self.data_manager.accounts_total_number())
+
+    def test_wrong_password_for_cached_user(self):
+        def fail_logging_in():
+            self.data_manager.log_in(self.email, "wrong_password")
+
+        self.assertRaises(InvalidCredentialsError, fail_logging_in)
+
+    def test_invalidating_on_create_database(self):
+        self._delete_users()
+        self.data_manager.create_database("./test_data/nonexistent")
+
+        def fail_logging_in():
+            self.data_manager.log_in(self.email, self.password)
+
+        self.assertRaises(InvalidCredentialsError, fail_logging_in)
+
+    def test_invalidating_replaced_user(self):
+        newer_user = TestData.users[1]._replace(
+            password="new_password",
+            created_at="2023-11-25 02:19:37"
+        )
+        self.data_manager.database_creator.feed_data([newer_user])
+        self.data_manager.log_in(self.email, "new_password")
+
+        self.assertIsInstance(self.data_manager._authenticated_user, User)
+
+    def test_invalidating_user_replaced_in_batch(self):
+        self.data_manager.database_creator.batch_size = 10
+        self.test_invalidating_replaced_user()
+
+
+class ExternalWritesTestCase(unittest.TestCase):
+    """
+    The database is changed by another process (e.g. create_database),
+    while the query server keeps cached credentials.
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        database_path = os.path.join(self.directory, "users.db")
+        self.database_url = f"sqlite:///{database_path}"
+        self.data_manager = DataManager(
+            self.database_url, auth_cache=AuthenticationCache())
+        self.data_manager.database_creator.feed_data(TestData.users)
+        self.email = "opoole@example.org"
+        self.password = "+3t)mSM6xX"
+        self._log_in()
+
+    def tearDown(self):
+        self.data_manager.engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def _log_in(self):
+        self.data_manager.log_in(self.email, self.password)
+        self.data_manager.log_out()
+        # as the query server does after each request
+        self.data_manager.session.rollback()
+
+    def test_logging_in_from_cache_without_external_writes(self):
+        with mock.patch.object(self.data_manager.session, "query") as query:
+            self._log_in()
+        query.assert_not_called()
+
+    def test_clearing_cache_on_external_write(self):
+        engine = create_engine(self.database_url)
+        with engine.begin() as connection:
+            connection.execute(delete(Child.__table__).where(
+                Child.__table__.c.parent_id == self.email))
+            connection.execute(delete(User.__table__).where(
+                User.__table__.c.email == self.email))
+        engine.dispose()
+
+        self.assertRaises(InvalidCredentialsError, self._log_in)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,12 @@
+import io
 import unittest
+from contextlib import redirect_stdout
 from datetime import datetime
-from unittest.mock import patch, call
+from unittest.mock import patch
 
 from modules.data_printer import print_oldest_account, \
-    print_children_by_age, print_children, print_users_children_same_age
+    print_children_by_age, print_children, print_users_children_same_age, \
+    OutputWriter
 
 
 class Child:
@@ -29,12 +32,7 @@ class DataPrinterTestCase(unittest.TestCase):
         def __str__(self):
             return f"{self.firstname}, {self.telephone_number}"
 
-    ages_distribution = [
-        {
-            "age": 8,
-            "count": 1
-        }
-    ]
+    ages_distribution = [(8, 1)]
 
     @patch("builtins.print")
     def test_printing_longest_existing_account(self, mocked_print):
@@ -44,35 +42,55 @@ class DataPrinterTestCase(unittest.TestCase):
                            "created_at: 1990-12-12 13:20:00\n")
         mocked_print.assert_called_with(expected_output)
 
-    @patch("builtins.print")
-    def test_printing_children_by_age(self, mocked_print):
-        print_children_by_age(self.ages_distribution)
-        expected_output = "age: 8, count: 1"
-        mocked_print.assert_called_with(expected_output)
+    def _get_output(self, print_function, *args):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            print_function(*args)
+        return output.getvalue()
 
-    @patch("builtins.print")
-    def test_print_children(self, mocked_print):
-        print_children(self.User.children)
-        expected_output = [
-            call("Archibald, 2"),
-            call("Tim, 15")
-        ]
-        self.assertEqual(expected_output, mocked_print.mock_calls)
+    def test_printing_children_by_age(self):
+        output = self._get_output(print_children_by_age,
+                                  [(8, 1), (14, 2)])
+        expected_output = "age: 8, count: 1\nage: 14, count: 2\n"
+        self.assertEqual(expected_output, output)
 
-    @patch("builtins.print")
-    def test_print_users_with_children_of_same_age(self, mocked_print):
-        input_data = {
-            self.User(): self.User.children
-        }
-        print_users_children_same_age(input_data)
-        expected_output = [
-            call('Boris, 123456789: ', end=''),
-            call('Archibald, 2', end=''),
-            call('; ', end=''),
-            call('Tim, 15', end=''),
-            call()
-        ]
-        self.assertEqual(expected_output, mocked_print.mock_calls)
+    def test_print_children(self):
+        output = self._get_output(print_children, self.User.children)
+        expected_output = "Archibald, 2\nTim, 15\n"
+        self.assertEqual(expected_output, output)
+
+    def test_print_users_with_children_of_same_age(self):
+        input_data = (
+            (self.User(), self.User.children),
+            ("Anna, 987654321", [Child("Ben", 2)])
+        )
+        output = self._get_output(print_users_children_same_age, input_data)
+        expected_output = ("Boris, 123456789: Archibald, 2; Tim, 15\n"
+                           "Anna, 987654321: Ben, 2\n")
+        self.assertEqual(expected_output, output)
+
+
+class OutputWriterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.buffer = io.BytesIO()
+        self.stream = io.TextIOWrapper(self.buffer, encoding="utf-8")
+
+    def test_writing_in_chunks(self):
+        writer = OutputWriter(self.stream, chunk_size=10)
+        writer.write("Zoë, 5\n")
+        self.assertEqual(b"", self.buffer.getvalue())
+        writer.write("Tim, 15\n")
+        self.assertEqual("Zoë, 5\nTim, 15\n".encode("utf-8"),
+                         self.buffer.getvalue())
+
+    def test_keeping_order_with_printed_text(self):
+        print("header", file=self.stream)
+        with OutputWriter(self.stream) as writer:
+            writer.write("Tim, 15\n")
+        print("footer", file=self.stream)
+        self.stream.flush()
+        self.assertEqual(b"header\nTim, 15\nfooter\n",
+                         self.buffer.getvalue())
 
 
 if __name__ == '__main__':
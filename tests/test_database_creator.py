@@ -1,11 +1,23 @@
+import io
+import json
+import os
+import queue
+import shutil
+import tempfile
 import unittest
+from contextlib import redirect_stderr
 from datetime import datetime
+from unittest import mock
 
 from data_importer.csv_importer import CSVImporter
 from data_importer.json_importer import JsonImporter
 from data_importer.xml_importer import XMLImporter
-from database.database_creator import DatabaseCreator
-from database.models import User, Child, Role, start_engine, drop_all
+from data_importer.records import UserRecord, ChildRecord
+from database.database_creator import DatabaseCreator, prepare_file
+from sqlalchemy import func
+
+from database.models import User, Child, Role, ImportedFile, \
+    ChildrenAgeStats, start_engine, drop_all
 from utils.helpers import list_files_for_import
 from utils.security import check_password_hash
 
@@ -21,7 +33,7 @@ class DatabaseCreatorSetup:
 
 class DatabaseCreatorTestCase(DatabaseCreatorSetup, unittest.TestCase):
     class TestData:
-        user_with_children = [
+        user_with_children = [UserRecord.from_dict(user) for user in [
             {
                 "firstname": "Tiffany",
                 "telephone_number": "00804241616",
@@ -40,8 +52,8 @@ class DatabaseCreatorTestCase(DatabaseCreatorSetup, unittest.TestCase):
                     }
                 ]
             }
-        ]
-        user_without_children = [
+        ]]
+        user_without_children = [UserRecord.from_dict(user) for user in [
             {
                 "firstname": "Cathy",
                 "telephone_number": "(48)094885352",
@@ -51,8 +63,8 @@ class DatabaseCreatorTestCase(DatabaseCreatorSetup, unittest.TestCase):
                 "created_at": "2023-08-27 16:39:04",
                 "children": []
             }
-        ]
-        duplicate_users = [
+        ]]
+        duplicate_users = [UserRecord.from_dict(user) for user in [
             {
                 "firstname": "Amy",
                 "telephone_number": "+48361568741",
@@ -83,11 +95,11 @@ class DatabaseCreatorTestCase(DatabaseCreatorSetup, unittest.TestCase):
                     }
                 ]
             }
-        ]
+        ]]
 
     def test_adding_user_with_children(self):
         self.database_manager.feed_data(self.TestData.user_with_children)
-        user_email = self.TestData.user_with_children[0]["email"]
+        user_email = self.TestData.user_with_children[0].email
         user = self.session.query(User).filter_by(email=user_email).first()
         child = self.session.query(Child).filter_by(name="Alan").first()
 
@@ -98,7 +110,7 @@ class DatabaseCreatorTestCase(DatabaseCreatorSetup, unittest.TestCase):
     def test_normalized_phone_number(self):
         self.database_manager.feed_data(self.TestData.user_without_children)
         user = self.session.get(
-            User, self.TestData.user_without_children[0]["email"])
+            User, self.TestData.user_without_children[0].email)
         self.assertEqual("094885352", user.telephone_number)
 
     def test_add_user_with_malformed_email(self):
@@ -106,10 +118,8 @@ class DatabaseCreatorTestCase(DatabaseCreatorSetup, unittest.TestCase):
         Shouldn't add user with malformed email.
         """
         user_data = [
-            {
-                **self.TestData.user_without_children[0],
-                "email": "@cutHead.com"
-            }
+            self.TestData.user_without_children[0]._replace(
+                email="@cutHead.com")
         ]
         self.database_manager.feed_data(user_data)
         user = self.session.query(User).first()
@@ -117,7 +127,7 @@ class DatabaseCreatorTestCase(DatabaseCreatorSetup, unittest.TestCase):
 
     def test_adding_user_without_children(self):
         self.database_manager.feed_data(self.TestData.user_without_children)
-        user_email = self.TestData.user_without_children[0]["email"]
+        user_email = self.TestData.user_without_children[0].email
         user = self.session.query(User).filter_by(email=user_email).first()
 
         self.assertEqual(user.email, user_email)
@@ -159,40 +169,311 @@ class DatabaseCreatorTestCase(DatabaseCreatorSetup, unittest.TestCase):
         raise InvalidPhoneNumberError exception.
         """
         user_entry = [
-            {
-                **self.TestData.user_without_children[0],
-                "telephone_number": ""
-            }
+            self.TestData.user_without_children[0]._replace(
+                telephone_number="")
         ]
         self.database_manager.feed_data(user_entry)
-        user = self.session.get(User, user_entry[0]["email"])
+        user = self.session.get(User, user_entry[0].email)
         self.assertFalse(user)
 
     def test_password_hash(self):
         self.database_manager.feed_data(self.TestData.user_without_children)
         user = self.session.query(User).first()
-        password = self.TestData.user_without_children[0]["password"]
+        password = self.TestData.user_without_children[0].password
         self.assertTrue(check_password_hash(user.password_hash, password))
 
     def test_user_with_admin_role(self):
         user_data = self.TestData.user_without_children[0]
         self.database_manager.feed_data(self.TestData.user_without_children)
-        admin_user = self.session.get(User, user_data["email"])
+        admin_user = self.session.get(User, user_data.email)
 
         self.assertTrue("admin", admin_user.role.name)
 
     def test_user_with_user_role(self):
         user_data = [
-            {
-                **self.TestData.user_without_children[0],
-                "role": "user"
-            }
+            self.TestData.user_without_children[0]._replace(
+                role="user")
         ]
         self.database_manager.feed_data(user_data)
-        user = self.session.get(User, user_data[0]["email"])
+        user = self.session.get(User, user_data[0].email)
 
         self.assertEqual("user", user.role.name)
 
+    def test_no_orm_objects_built(self):
+        """
+        Users and children are inserted without building ORM objects.
+        """
+        self.database_manager.feed_data(self.TestData.user_with_children)
+        identity_map_objects = list(self.session.identity_map.values())
+
+        self.assertFalse([obj for obj in identity_map_objects
+                          if isinstance(obj, (User, Child))])
+
+
+class BatchedDatabaseCreatorTestCase(DatabaseCreatorTestCase):
+    """
+    Same scenarios as for the default batch size, with users of the same
+    list split between batches.
+    """
+    batch_size = 2
+
+    def setUp(self):
+        super().setUp()
+        self.database_manager.batch_size = self.batch_size
+
+
+class SingleUserBatchTestCase(BatchedDatabaseCreatorTestCase):
+    """
+    Duplicates are resolved against users stored by previous batches.
+    """
+    batch_size = 1
+
+
+class BatchedImportTestCase(DatabaseCreatorSetup, unittest.TestCase):
+    users = [UserRecord.from_dict(user) for user in [
+        {
+            "firstname": "Amy",
+            "telephone_number": "361568741",
+            "email": "brenda74@example.org",
+            "password": "+vJCXfFLe0",
+            "role": "user",
+            "created_at": "2023-03-01 04:14:24",
+            "children": [{"name": "Sara", "age": 8}]
+        },
+        {
+            "firstname": "Jamie",
+            "telephone_number": "700851384",
+            "email": "kcampbell@yahve.com",
+            "password": "+vJCXfFLe0",
+            "role": "user",
+            "created_at": "2023-03-02 04:14:24",
+            "children": []
+        },
+        # duplicates email of the first user and phone of the second one
+        {
+            "firstname": "Donna",
+            "telephone_number": "700851384",
+            "email": "brenda74@example.org",
+            "password": "+vJCXfFLe0",
+            "role": "user",
+            "created_at": "2023-03-05 04:14:24",
+            "children": [{"name": "Justin", "age": 15}]
+        }
+    ]]
+
+    def _reset_database(self):
+        self.tearDown()
+        self.setUp()
+
+    def _import(self, batch_size):
+        self.database_manager.batch_size = batch_size
+        self.database_manager.feed_data(self.users)
+        return self.session.query(User).all()
+
+    def test_newer_user_replaces_all_duplicates(self):
+        """
+        A user colliding with two older users replaces both of them.
+        """
+        for batch_size in (1, 2, 3):
+            with self.subTest(batch_size=batch_size):
+                users = self._import(batch_size)
+                child = self.session.query(Child).one()
+
+                self.assertEqual(["Donna"], [u.firstname for u in users])
+                self.assertEqual("Justin", child.name)
+                self._reset_database()
+
+    def test_same_database_for_any_batch_size(self):
+        files_to_import = list_files_for_import(
+            "./test_data/a", [".csv", ".xml", ".json"])
+        self.database_manager.feed_files(files_to_import)
+        expected_users = {(u.email, u.telephone_number, u.password_hash,
+                           u.role.name, u.created_at)
+                          for u in self.session.query(User)}
+        expected_children = {(c.parent_id, c.name, c.age)
+                             for c in self.session.query(Child)}
+        self._reset_database()
+
+        self.database_manager.batch_size = 1
+        self.database_manager.feed_files(files_to_import)
+        users = {(u.email, u.telephone_number, u.password_hash,
+                  u.role.name, u.created_at)
+                 for u in self.session.query(User)}
+        children = {(c.parent_id, c.name, c.age)
+                    for c in self.session.query(Child)}
+
+        self.assertSetEqual(expected_users, users)
+        self.assertSetEqual(expected_children, children)
+
+
+class AgeStatsTestCase(DatabaseCreatorSetup, unittest.TestCase):
+    users = BatchedImportTestCase.users
+
+    def _get_age_stats(self):
+        return {stats.age: stats.children_number
+                for stats in self.session.query(ChildrenAgeStats)}
+
+    def _count_children_by_age(self):
+        return dict(self.session.query(Child.age, func.count(Child.child_id))
+                    .group_by(Child.age).all())
+
+    def test_maintaining_stats_on_import(self):
+        """
+        Children of a replaced user are subtracted from the statistics.
+        """
+        newer_user = self.users[0]._replace(
+            created_at="2023-03-03 04:14:24",
+            children=[ChildRecord("Tim", 3)])
+        self.database_manager.feed_data(self.users[:2])
+        self.assertDictEqual({8: 1}, self._get_age_stats())
+
+        self.database_manager.feed_data([newer_user])
+        self.assertDictEqual({3: 1}, self._get_age_stats())
+
+    def test_maintaining_stats_on_batched_import(self):
+        for batch_size in (1, 2, 3):
+            with self.subTest(batch_size=batch_size):
+                self.database_manager.batch_size = batch_size
+                self.database_manager.feed_data(self.users[:2])
+                self.assertDictEqual({8: 1}, self._get_age_stats())
+
+                self.database_manager.feed_data(self.users[2:])
+                self.assertDictEqual({15: 1}, self._get_age_stats())
+                self.tearDown()
+                self.setUp()
+
+    def _feed_new_user(self):
+        new_user = self.users[1]._replace(
+            email="new@example.com", telephone_number="111222333",
+            children=[ChildRecord("Tim", 3)])
+        self.database_manager.feed_data([new_user])
+
+    def test_completing_empty_stats_of_older_database(self):
+        """
+        Databases created before the statistics were introduced get
+        an empty 'children_age_stats' table along with the schema.
+        """
+        self.database_manager.feed_data(self.users[:2])
+        self.session.query(ChildrenAgeStats).delete()
+        self.session.commit()
+
+        self._feed_new_user()
+        self.assertDictEqual({3: 1, 8: 1}, self._get_age_stats())
+
+    def test_creating_missing_stats_table_on_import(self):
+        self.database_manager.feed_data(self.users[:2])
+        ChildrenAgeStats.__table__.drop(self.engine)
+
+        self._feed_new_user()
+        self.assertDictEqual({3: 1, 8: 1}, self._get_age_stats())
+
+    def test_stats_consistent_after_importing_files(self):
+        files_to_import = list_files_for_import(
+            "./test_data/a", [".csv", ".xml", ".json"])
+        self.database_manager.feed_files(files_to_import)
+        self.assertDictEqual(self._count_children_by_age(),
+                             self._get_age_stats())
+        self.assertTrue(self.database_manager.rebuild_age_stats())
+
+    def test_rebuilding_inconsistent_stats(self):
+        self.database_manager.feed_data(self.users)
+        self.session.query(ChildrenAgeStats).delete()
+        self.session.add(ChildrenAgeStats(age=3, children_number=2))
+        self.session.commit()
+
+        self.assertFalse(self.database_manager.rebuild_age_stats())
+        self.assertDictEqual({15: 1}, self._get_age_stats())
+        self.assertTrue(self.database_manager.rebuild_age_stats())
+
+    def test_creating_missing_stats_table(self):
+        """
+        Databases created before the statistics were introduced lack
+        the 'children_age_stats' table.
+        """
+        self.database_manager.feed_data(self.users)
+        ChildrenAgeStats.__table__.drop(self.engine)
+
+        self.assertFalse(self.database_manager.rebuild_age_stats())
+        self.assertDictEqual({15: 1}, self._get_age_stats())
+
+
+class IncrementalImportTestCase(DatabaseCreatorSetup, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.data_dir = tempfile.mkdtemp()
+        shutil.copytree("./test_data/a", self.data_dir, dirs_exist_ok=True)
+        self.files_to_import = list_files_for_import(
+            self.data_dir, [".csv", ".xml", ".json"])
+        self.database_manager.feed_files(self.files_to_import)
+        # leaves the 'imported_files' table intact
+        self.session.query(Child).delete()
+        self.session.query(User).delete()
+        self.session.commit()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+        super().tearDown()
+
+    def test_recording_imported_files(self):
+        paths = {imported_file.path for imported_file
+                 in self.session.query(ImportedFile)}
+        expected_paths = {os.path.abspath(filename)
+                          for filename in self.files_to_import}
+        self.assertSetEqual(expected_paths, paths)
+
+    def test_skipping_unchanged_files(self):
+        self.database_manager.feed_files(self.files_to_import)
+        self.assertEqual(0, self.session.query(User).count())
+
+    def test_skipping_touched_files(self):
+        """
+        Files with a changed modification time, but the same content
+        are not imported.
+        """
+        for filename in self.files_to_import:
+            os.utime(filename, (0, 0))
+        self.database_manager.feed_files(self.files_to_import)
+        self.assertEqual(0, self.session.query(User).count())
+
+    def test_importing_modified_file(self):
+        filename = os.path.join(self.data_dir, "c", "file3.json")
+        with open(filename, "a") as file:
+            file.write("\n")
+        self.database_manager.feed_files(self.files_to_import)
+        user = self.session.query(User).one()
+
+        self.assertEqual("Patricia", user.firstname)
+
+    def test_not_recording_files_which_failed_to_load(self):
+        """
+        A file which failed to load is imported again by the next run.
+        """
+        filename = os.path.join(self.data_dir, "c", "file3.json")
+        imported_size = self.session.get(
+            ImportedFile, os.path.abspath(filename)).size
+        get_changed_files = self.database_manager._get_changed_files
+
+        def remove_file_after_scan(filenames):
+            changed_files = get_changed_files(filenames)
+            os.remove(filename)
+            return changed_files
+
+        for jobs in (1, 2):
+            # modified
+            shutil.copy("./test_data/a/c/file3.json", filename)
+            with open(filename, "a") as file:
+                file.write("\n")
+            with self.subTest(jobs=jobs), mock.patch.object(
+                    self.database_manager, "_get_changed_files",
+                    remove_file_after_scan), \
+                    redirect_stderr(io.StringIO()):
+                self.database_manager.jobs = jobs
+                self.database_manager.feed_files(self.files_to_import)
+                imported_file = self.session.get(
+                    ImportedFile, os.path.abspath(filename))
+
+                self.assertEqual(imported_size, imported_file.size)
+
 
 class RolesTestCase(DatabaseCreatorSetup, unittest.TestCase):
     def test_adding_roles(self):
@@ -290,6 +571,112 @@ class ImportingDataFromFiles(DatabaseCreatorSetup, unittest.TestCase):
         user_query = self.session.query(User)
         self.assertEqual(4, user_query.count())
 
+    def test_streaming_files(self):
+        """
+        Importing files record by record, in batches.
+        """
+        path = "./test_data/a"
+        extensions = [".csv", ".xml", ".json"]
+        files_to_import = list_files_for_import(path, extensions)
+        self.database_manager.stream = True
+        self.database_manager.batch_size = 1
+        self.database_manager.feed_files(files_to_import)
+        identity_map_objects = list(self.session.identity_map.values())
+        user_query = self.session.query(User)
+
+        self.assertEqual(4, user_query.count())
+        # memory used by the session doesn't grow with imported data
+        self.assertFalse([obj for obj in identity_map_objects
+                          if isinstance(obj, (User, Child))])
+
+    def test_importing_files_in_parallel(self):
+        path = "./test_data/a"
+        extensions = [".csv", ".xml", ".json"]
+        files_to_import = list_files_for_import(path, extensions)
+        self.database_manager.jobs = 2
+        self.database_manager.feed_files(
+            files_to_import + ["./wrong/path/file.csv"])
+        user_query = self.session.query(User)
+        self.assertEqual(4, user_query.count())
+
+    def test_streaming_files_in_parallel(self):
+        path = "./test_data/a"
+        extensions = [".csv", ".xml", ".json"]
+        files_to_import = list_files_for_import(path, extensions)
+        self.database_manager.jobs = 2
+        self.database_manager.stream = True
+        self.database_manager.feed_files(files_to_import)
+        user_query = self.session.query(User)
+        self.assertEqual(4, user_query.count())
+
+    def test_raising_parse_errors_in_parallel(self):
+        """
+        As in a sequential import, a malformed file stops the import.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "bad.json")
+            with open("./test_data/users.json") as file:
+                content = file.read()
+            with open(filename, "w") as file:
+                file.write(content[:len(content) // 2])
+
+            for jobs in (1, 2):
+                with self.subTest(jobs=jobs):
+                    self.database_manager.jobs = jobs
+                    self.assertRaises(
+                        json.JSONDecodeError, self.database_manager.feed_files,
+                        ["./test_data/users.csv", filename])
+                    self.assertEqual(0, self.session.query(User).count())
+
+    def test_restoring_file_order(self):
+        prepared_chunks = [(1, ["b1"]), (0, ["a1"]), (2, ["c1"]), (2, None),
+                           (1, ["b2"]), (1, None), (0, ["a2"]), (0, None)]
+        self.assertListEqual(
+            [["a1"], ["a2"], ["b1"], ["b2"], ["c1"]],
+            list(DatabaseCreator._in_file_order(iter(prepared_chunks))))
+
+
+class PrepareFileTestCase(DatabaseCreatorSetup, unittest.TestCase):
+    def _prepare_file(self, filename):
+        messages = queue.Queue()
+        fail_reason = prepare_file(
+            3, filename, self.database_manager._role_ids, messages)
+        return fail_reason, [messages.get() for _ in range(messages.qsize())]
+
+    def test_passing_users_in_chunks(self):
+        """
+        Workers of the parallel import don't hold whole files.
+        """
+        with mock.patch("database.database_creator.DEFAULT_BATCH_SIZE", 1):
+            fail_reason, messages = self._prepare_file(
+                "./test_data/users.json")
+        chunks = [chunk for _, chunk in messages[:-1]]
+        prepared_users = [user for prepared_chunk, invalid_users in chunks
+                          for user in prepared_chunk + invalid_users]
+
+        self.assertEqual("", fail_reason)
+        self.assertEqual((3, None), messages[-1])
+        self.assertTrue(all(index == 3 for index, _ in messages))
+        self.assertTrue(all(len(prepared_chunk) + len(invalid_users) == 1
+                            for prepared_chunk, invalid_users in chunks))
+        self.assertEqual(len(list(JsonImporter("./test_data/users.json"))),
+                         len(prepared_users))
+
+    def test_file_not_loaded(self):
+        fail_reason, messages = self._prepare_file("./wrong/path/file.csv")
+        self.assertTrue(fail_reason)
+        self.assertListEqual([(3, None)], messages)
+
+    def test_raising_other_errors(self):
+        """
+        Errors other than a missing file are raised (the end of the file
+        is still signalled).
+        """
+        messages = queue.Queue()
+        self.assertRaises(ValueError, prepare_file, 3, "./test_data/a/b",
+                          self.database_manager._role_ids, messages)
+        self.assertEqual((3, None), messages.get_nowait())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,13 @@
+import os
+import tempfile
 import unittest
 from datetime import datetime
 
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError, OperationalError
 
-from database.models import User, start_engine, drop_all, Role, Child
+from database.models import User, start_engine, drop_all, Role, Child, \
+    create_indexes
 from utils.exceptions import InvalidEmailError
 
 
@@ -19,6 +23,63 @@ class DatabaseTestCaseAbs(unittest.TestCase):
         pass
 
 
+class StartEngineTestCase(unittest.TestCase):
+    def test_creating_schema(self):
+        engine, _ = start_engine("sqlite:///:memory:")
+        self.assertIn("users", inspect(engine).get_table_names())
+
+    def test_skipping_schema_creation(self):
+        engine, _ = start_engine("sqlite:///:memory:", create_schema=False)
+        self.assertListEqual([], inspect(engine).get_table_names())
+
+    def test_creating_missing_indexes(self):
+        """
+        Indexes added to the models are created in existing databases.
+        """
+        engine, _ = start_engine("sqlite:///:memory:")
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "DROP INDEX ix_children_age_parent_id_name")
+        create_indexes(engine)
+        index_names = [index["name"]
+                       for index in inspect(engine).get_indexes("children")]
+        self.assertIn("ix_children_age_parent_id_name", index_names)
+
+
+class ProfileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.database_url = "sqlite:///" + os.path.join(
+            self.directory.name, "test.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _get_pragma(self, engine, pragma):
+        with engine.connect() as connection:
+            return connection.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+
+    def test_bulk_load_profile(self):
+        engine, _ = start_engine(self.database_url, profile="bulk_load")
+        self.assertIn("users", inspect(engine).get_table_names())
+        self.assertEqual("wal", self._get_pragma(engine, "journal_mode"))
+        self.assertEqual(1, self._get_pragma(engine, "synchronous"))
+        self.assertEqual(2, self._get_pragma(engine, "temp_store"))
+        engine.dispose()
+
+    def test_serving_profile(self):
+        engine, _ = start_engine(self.database_url)
+        engine.dispose()
+        engine, session = start_engine(self.database_url,
+                                       create_schema=False,
+                                       profile="serving")
+        self.assertEqual(1, self._get_pragma(engine, "query_only"))
+        session.add(Role(name="user"))
+        self.assertRaises(OperationalError, session.commit)
+        session.rollback()
+        engine.dispose()
+
+
 class UserRoleTestCase(DatabaseTestCaseAbs):
     def setup_test_data(self):
         self.admin_role = Role(
@@ -0,0 +1,58 @@
+import tempfile
+import unittest
+
+from benchmarks.dataset import generate_users, write_dataset, \
+    DATASET_WRITERS
+from database.database_creator import DatabaseCreator
+from utils.helpers import normalize_telephone_num
+from data_importer.records import normalize_many, validate_many
+from utils.validators import is_valid_telephone_number
+
+
+class DatasetGeneratorTestCase(unittest.TestCase):
+    options = {
+        "duplicate_emails": 0.2,
+        "duplicate_phones": 0.2,
+        "phone_noise": 0.5
+    }
+
+    def test_deterministic(self):
+        self.assertListEqual(list(generate_users(100, **self.options)),
+                             list(generate_users(100, **self.options)))
+
+    def test_files_read_by_importers(self):
+        """
+        Importers read the same users as were generated.
+        """
+        users = list(generate_users(30, **self.options))
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_dataset(directory, 30, **self.options)
+            imported_users = []
+            for path in paths:
+                Importer = DatabaseCreator.get_importer_for_file(path)
+                imported_users.extend(Importer(path))
+
+        self.assertEqual(len(DATASET_WRITERS), len(paths))
+        self.assertListEqual(users, imported_users)
+
+    def test_noisy_phone_numbers_valid(self):
+        users = list(generate_users(100, phone_noise=1.0))
+        _, invalid_users = validate_many(normalize_many(users))
+
+        self.assertFalse(invalid_users)
+        self.assertFalse(any(is_valid_telephone_number(user.telephone_number)
+                             for user in users))
+
+    def test_duplicates(self):
+        users = list(generate_users(1000, **self.options))
+        emails = {user.email for user in users}
+        phones = {normalize_telephone_num(user.telephone_number)
+                  for user in users}
+
+        self.assertLess(len(emails), 900)
+        self.assertLess(len(phones), 900)
+        self.assertEqual("admin", users[0].role)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+from datetime import datetime
+
+from data_importer.deduplicator import Deduplicator, \
+    PreparedUsersDeduplicator
+from data_importer.records import UserRecord
+
+
+def make_user(firstname, email, telephone_number, created_at):
+    return UserRecord(
+        firstname=firstname,
+        telephone_number=telephone_number,
+        email=email,
+        password="+vJCXfFLe0",
+        role="user",
+        created_at=created_at,
+        children=[]
+    )
+
+
+class DeduplicatorTestCase(unittest.TestCase):
+    amy = make_user("Amy", "brenda74@example.org", "+48361568741",
+                    "2023-03-01 04:14:24")
+    jamie = make_user("Jamie", "kcampbell@yahve.com", "700851384",
+                      "2023-03-02 04:14:24")
+
+    @staticmethod
+    def _firstnames(users):
+        return [user.firstname for user in users]
+
+    def test_no_duplicates(self):
+        users = Deduplicator([self.amy, self.jamie])
+        self.assertListEqual(["Amy", "Jamie"], self._firstnames(users))
+        self.assertEqual(2, len(users))
+
+    def test_newer_duplicate_by_email(self):
+        newer_amy = self.amy._replace(firstname="Amelia",
+                                      telephone_number="123456789",
+                                      created_at="2023-03-05 04:14:24")
+        users = Deduplicator([self.amy, newer_amy])
+        self.assertListEqual(["Amelia"], self._firstnames(users))
+
+    def test_older_duplicate_by_normalized_phone(self):
+        """
+        Telephone numbers are compared after normalization.
+        """
+        older_amy = self.amy._replace(email="amy@example.org",
+                                      telephone_number="(48) 361 568 741",
+                                      created_at="2023-02-01 04:14:24")
+        users = Deduplicator([self.amy, older_amy])
+        self.assertListEqual(["Amy"], self._firstnames(users))
+
+    def test_equal_timestamps_keep_first(self):
+        twin = self.amy._replace(firstname="Twin")
+        users = Deduplicator([self.amy, twin])
+        self.assertListEqual(["Amy"], self._firstnames(users))
+
+    def test_newer_entry_colliding_with_two_entries(self):
+        """
+        Entry duplicating email of one user and phone of another one
+        replaces both if it is newer than each of them.
+        """
+        donna = make_user("Donna", self.amy.email,
+                          self.jamie.telephone_number,
+                          "2023-03-05 04:14:24")
+        users = Deduplicator([self.amy, self.jamie, donna])
+        self.assertListEqual(["Donna"], self._firstnames(users))
+
+    def test_entry_colliding_with_newer_entry(self):
+        """
+        Entry is rejected if any of the colliding entries is newer.
+        """
+        donna = make_user("Donna", self.amy.email,
+                          self.jamie.telephone_number,
+                          "2023-03-01 14:14:24")
+        users = Deduplicator([self.amy, self.jamie, donna])
+        self.assertListEqual(["Amy", "Jamie"], self._firstnames(users))
+
+    def test_invalid_entry_passed_through(self):
+        """
+        Invalid entries don't replace valid ones.
+        """
+        invalid_amy = self.amy._replace(telephone_number="",
+                                        created_at="2023-03-05 04:14:24")
+        users = Deduplicator([self.amy, invalid_amy])
+        self.assertListEqual([self.amy, invalid_amy], list(users))
+
+
+class PreparedUsersDeduplicatorTestCase(unittest.TestCase):
+    @staticmethod
+    def _prepared_user(email, telephone_number, created_at):
+        user_row = {
+            "email": email,
+            "telephone_number": telephone_number,
+            "created_at": datetime.fromisoformat(created_at)
+        }
+        return user_row, []
+
+    def test_newer_duplicate(self):
+        older = self._prepared_user("brenda74@example.org", "361568741",
+                                    "2023-03-01 04:14:24")
+        newer = self._prepared_user("amy@example.org", "361568741",
+                                    "2023-03-05 04:14:24")
+        self.assertListEqual([newer],
+                             list(PreparedUsersDeduplicator([older, newer])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,8 @@
 Tests for the script.py.
 """
 import os
+import subprocess
+import sys
 import unittest
 from unittest import mock
 from unittest.mock import Mock, patch
@@ -31,6 +33,46 @@ class EntryScriptTestCase(unittest.TestCase):
         exit_status = os.waitstatus_to_exitcode(wait_status)
         self.assertEqual(fail_status, exit_status)
 
+    def test_lazy_importers(self):
+        """
+        Importers (and lxml) are not loaded unless the database is being
+        created.
+        """
+        code = ("import sys, script; "
+                "print('lxml' in sys.modules, "
+                "'database.database_creator' in sys.modules)")
+        output = subprocess.check_output(
+            [sys.executable, "-c", code], cwd="..", text=True)
+        self.assertEqual("False False", output.strip())
+
+
+class ProfileTestCase(unittest.TestCase):
+    def test_bulk_load_profile(self):
+        self.assertEqual("bulk_load",
+                         script.get_profile("create_database", True))
+
+    def test_serving_profile(self):
+        for task in ("print-children", "serve", "batch"):
+            with self.subTest(task=task):
+                self.assertEqual("serving", script.get_profile(task, False))
+
+    def test_writing_tasks_rejected_with_serving_profile(self):
+        """
+        serve and batch can't execute writing tasks with the read-only
+        profile.
+        """
+        self.assertIn("check-age-stats",
+                      script.get_rejected_tasks("serving"))
+        self.assertFalse(script.get_rejected_tasks(None))
+
+    def test_default_profile(self):
+        """
+        Tasks creating the schema or writing to the database
+        can't be executed with the read-only profile.
+        """
+        self.assertIsNone(script.get_profile("print-children", True))
+        self.assertIsNone(script.get_profile("check-age-stats", False))
+
 
 class TasksTestCase(unittest.TestCase):
     def setUp(self):
@@ -40,6 +82,8 @@ class TasksTestCase(unittest.TestCase):
         self.args.login = "login"
         self.args.password = "password"
         self.args.task = ""
+        self.args.format = "text"
+        self.args.columnar = False
 
     def _run_task(self):
         with mock.patch("script.DataManager") as DataManager:
@@ -63,8 +107,11 @@ class TasksTestCase(unittest.TestCase):
         self.args.task = "create_database"
 
         DataManager = self._run_task()
-        DataManager.assert_called_with(script.DATABASE_URL)
-        self.data_manager.create_database.assert_called_with(script.DATA_DIR)
+        DataManager.assert_called_with(script.DATABASE_URL,
+                                       profile="bulk_load")
+        self.data_manager.create_database.assert_called_with(
+            script.DATA_DIR, batch_size=self.args.batch_size,
+            stream=self.args.stream, jobs=self.args.jobs)
 
     def test_log_in(self):
         """
@@ -120,6 +167,26 @@ class TasksTestCase(unittest.TestCase):
         self.data_manager.group_children_by_age.assert_called()
         group_children_by_age.assert_called_with(expected_return_value)
 
+    @mock.patch("builtins.print")
+    def test_check_age_stats(self, mock_print):
+        self.args.task = "check-age-stats"
+        self.data_manager.check_age_stats = Mock(return_value=False)
+        self._run_task()
+
+        self.data_manager.check_age_stats.assert_called()
+        mock_print.assert_called_with(
+            "Age statistics were inconsistent and have been rebuilt.")
+
+    @mock.patch("script.serialize")
+    def test_machine_readable_format(self, serialize):
+        self.args.task = "group-by-age"
+        self.args.format = "csv"
+        self.data_manager.children_by_age_report = Mock(
+            return_value="report")
+        self._run_task()
+
+        serialize.assert_called_with("report", "csv")
+
     @mock.patch("script.print_children")
     def test_print_children(self, print_children):
         self.args.task = "print-children"
@@ -1,7 +1,7 @@
 import unittest
 
 from utils.helpers import normalize_telephone_num, list_files_for_import, \
-    get_file_extension
+    get_file_extension, chunked
 
 
 class TelephoneNumberConverterTestCase(unittest.TestCase):
@@ -34,6 +34,11 @@ class TelephoneNumberConverterTestCase(unittest.TestCase):
         result = normalize_telephone_num(input_num)
         self.assertEqual(self.expected_output, result)
 
+    def test_non_ascii_characters(self):
+        input_num = "\u2212(48)\u00a0123\u2009456\u2009789"
+        result = normalize_telephone_num(input_num)
+        self.assertEqual(self.expected_output, result)
+
 
 class FileUtilsTestCase(unittest.TestCase):
     def test_getting_file_extension(self):
@@ -59,5 +64,14 @@ class FileUtilsTestCase(unittest.TestCase):
         self.assertSetEqual(expected_output, set(output))
 
 
+class ChunkedTestCase(unittest.TestCase):
+    def test_splitting_into_chunks(self):
+        result = list(chunked(range(5), 2))
+        self.assertListEqual([[0, 1], [2, 3], [4]], result)
+
+    def test_empty_iterable(self):
+        self.assertListEqual([], list(chunked([], 2)))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,95 @@
+"""
+Query plan regression tests: no DataManager query may fall back
+to a full table scan.
+"""
+import re
+import unittest
+
+from sqlalchemy import event
+
+from database.data_manager import DataManager
+from database.models import drop_all
+from tests.test_data_manager import TestData
+
+# full table scan (index scans are reported as 'SCAN <table> USING ...')
+FULL_SCAN_PATTERN = re.compile(r"^SCAN (\w+)$")
+
+
+class QueryPlanTestCase(unittest.TestCase):
+    # tables with a row per distinct age - scanning them is expected
+    scannable_tables = {"children_age_stats"}
+
+    def setUp(self):
+        self.data_manager = DataManager("sqlite:///:memory:")
+        self.data_manager.database_creator.feed_data(TestData.users)
+        self.data_manager.log_in("opoole@example.org", "+3t)mSM6xX")
+        self.statements = []
+        event.listen(self.data_manager.engine, "before_cursor_execute",
+                     self._record_statement)
+
+    def tearDown(self):
+        event.remove(self.data_manager.engine, "before_cursor_execute",
+                     self._record_statement)
+        drop_all(self.data_manager.engine)
+
+    def _record_statement(self, connection, cursor, statement, parameters,
+                          context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.statements.append((statement, parameters))
+
+    def _get_full_scans(self, task):
+        """
+        Run a task and explain all SELECT statements it executed.
+        :return: list of (statement, scanned table) tuples
+        """
+        self.statements.clear()
+        task()
+        statements = list(self.statements)
+        self.assertTrue(statements, "no queries were executed")
+
+        connection = self.data_manager.session.connection()
+        full_scans = []
+        for statement, parameters in statements:
+            query_plan = connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters)
+            for row in query_plan:
+                match = FULL_SCAN_PATTERN.match(row.detail)
+                if match and match.group(1) not in self.scannable_tables:
+                    full_scans.append((statement, match.group(1)))
+        return full_scans
+
+    def test_no_full_table_scans(self):
+        data_manager = self.data_manager
+        tasks = {
+            "log_in (email)": lambda: data_manager.log_in(
+                "woodsjerry@example.com", "z2Y%0Hbcsi"),
+            "log_in (telephone number)": lambda: data_manager.log_in(
+                "823816375", "z2Y%0Hbcsi"),
+            "accounts_total_number": data_manager.accounts_total_number,
+            "get_oldest_account": data_manager.get_oldest_account,
+            "group_children_by_age": data_manager.group_children_by_age,
+            "get_children": lambda: list(data_manager.get_children()),
+            "users_w_similar_aged_children":
+                lambda: list(data_manager.users_w_similar_aged_children()),
+            "similar_aged_children_for_users":
+                lambda: data_manager.similar_aged_children_for_users(
+                    ["woodsjerry@example.com", "opoole@example.org"]),
+            "check_age_stats": data_manager.check_age_stats,
+            "accounts_report": lambda: list(data_manager.accounts_report()),
+            "oldest_account_report":
+                lambda: list(data_manager.oldest_account_report()),
+            "children_by_age_report":
+                lambda: list(data_manager.children_by_age_report()),
+            "children_report": lambda: list(data_manager.children_report()),
+            "similar_aged_children_report":
+                lambda: list(data_manager.similar_aged_children_report())
+        }
+        for name, task in tasks.items():
+            with self.subTest(task=name):
+                self.assertListEqual([], self._get_full_scans(task))
+            data_manager.log_out()
+            data_manager.log_in("opoole@example.org", "+3t)mSM6xX")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from database.data_manager import DataManager
+from modules.query_server import QueryServer, send_request
+from script import match_task
+from tests.test_data_manager import TestData
+from utils.exceptions import QueryServerError
+
+
+class QueryServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        database_path = os.path.join(self.directory, "users.db")
+        self.socket_path = os.path.join(self.directory, "server.sock")
+        self.data_manager = DataManager(f"sqlite:///{database_path}")
+        self.data_manager.database_creator.feed_data(TestData.users)
+        self.server = QueryServer(
+            self.socket_path, self.data_manager, match_task)
+        self.server_thread = threading.Thread(
+            target=self.server.serve_forever)
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server_thread.join()
+        self.server.server_close()
+        self.data_manager.engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def _send(self, task, login="opoole@example.org",
+              password="+3t)mSM6xX", output_format="text"):
+        return send_request(task, login, password, self.socket_path,
+                            output_format)
+
+    def test_executing_task(self):
+        output = self._send("print-children")
+        self.assertEqual("George, 8\nMarie, 17\nSusan, 14\n", output)
+
+    def test_consecutive_users(self):
+        """
+        Each request is executed on behalf of its own user.
+        """
+        self._send("print-children")
+        output = self._send("print-children", "823816375", "z2Y%0Hbcsi")
+        self.assertEqual("Angela, 14\nMichael, 17\n", output)
+
+    def test_output_format(self):
+        output = self._send("print-children", output_format="csv")
+        self.assertEqual("name,age\nGeorge,8\nMarie,17\n"
+                         "Susan,14\n", output)
+
+    def test_rejected_task(self):
+        self.server.rejected_tasks = ("check-age-stats",)
+        output = self._send("check-age-stats")
+        self.assertEqual("Task check-age-stats can't be executed by the "
+                         "query server (the database is read-only).\n",
+                         output)
+
+    def test_invalid_login(self):
+        output = self._send("print-children", password="wrong_password")
+        self.assertEqual("Invalid Login\n", output)
+
+    def test_insufficient_privileges(self):
+        output = self._send("print-all-accounts", "823816375", "z2Y%0Hbcsi")
+        self.assertEqual("Invalid Login\n", output)
+
+    def test_server_error(self):
+        self.server.run_task = None
+        self.assertRaises(QueryServerError,
+                          lambda: self._send("print-children"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from data_importer.records import UserRecord, ChildRecord, \
+    normalize_many, validate_many
+
+
+class RecordsTestCase(unittest.TestCase):
+    user_data = {
+        "firstname": "Justin",
+        "telephone_number": "678762794",
+        "email": "opoole@example.org",
+        "password": "+3t)mSM6xX",
+        "role": "admin",
+        "created_at": "2022-11-25 02:19:37",
+        "children": [
+            {
+                "name": "Marie",
+                "age": 17
+            }
+        ]
+    }
+
+    def test_user_from_dict(self):
+        user = UserRecord.from_dict(self.user_data)
+
+        self.assertEqual("opoole@example.org", user.email)
+        self.assertListEqual([ChildRecord("Marie", 17)], user.children)
+        self.assertIsInstance(user.children[0], ChildRecord)
+
+    def test_no_instance_dict(self):
+        user = UserRecord.from_dict(self.user_data)
+
+        self.assertFalse(hasattr(user, "__dict__"))
+        self.assertFalse(hasattr(user.children[0], "__dict__"))
+
+
+class BatchValidationTestCase(unittest.TestCase):
+    users = [
+        UserRecord("Amy", "+48361568741", "brenda74@example.org",
+                   "+vJCXfFLe0", "user", "2023-03-01 04:14:24", []),
+        UserRecord("Cathy", "094885352", "@cutHead.com",
+                   "+vJCXfFLe0", "user", "2023-03-01 04:14:24", []),
+        UserRecord("Jamie", "", "kcampbell@yahve.com",
+                   "+vJCXfFLe0", "user", "2023-03-01 04:14:24", [])
+    ]
+
+    def test_normalize_many(self):
+        result = normalize_many(self.users)
+        self.assertListEqual(["361568741", "094885352", ""],
+                             [user.telephone_number for user in result])
+        # input is left intact
+        self.assertEqual("+48361568741", self.users[0].telephone_number)
+
+    def test_validate_many(self):
+        valid_users, invalid_users = validate_many(
+            normalize_many(self.users))
+        self.assertListEqual(
+            ["Amy"], [user.firstname for user in valid_users])
+        self.assertListEqual(
+            ["Cathy", "Jamie"], [user.firstname for user in invalid_users])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import io
+import unittest
+
+from sqlalchemy import CursorResult
+
+from database.data_manager import DataManager
+from database.models import drop_all
+from modules.serializers import serialize
+from tests.test_data_manager import TestData
+
+
+class SerializersTestCase(unittest.TestCase):
+    def setUp(self):
+        self.data_manager = DataManager("sqlite:///:memory:")
+        self.data_manager.database_creator.feed_data(TestData.users)
+        self.data_manager.log_in("opoole@example.org", "+3t)mSM6xX")
+
+    def tearDown(self):
+        drop_all(self.data_manager.engine)
+
+    def _serialize(self, result, output_format):
+        output = io.StringIO()
+        serialize(result, output_format, output)
+        return output.getvalue()
+
+    def test_json(self):
+        output = self._serialize(
+            self.data_manager.children_report(), "json")
+        expected_output = ('[\n{"name": "George", "age": 8},\n'
+                           '{"name": "Marie", "age": 17},\n'
+                           '{"name": "Susan", "age": 14}\n]\n')
+        self.assertEqual(expected_output, output)
+
+    def test_empty_json(self):
+        user_without_children = TestData.users[2]._replace(
+            telephone_number="111222333")
+        self.data_manager.database_creator.feed_data([user_without_children])
+        self.data_manager.log_out()
+        self.data_manager.log_in("ngreen@example.org", "z2Y%0Hbcsi")
+        output = self._serialize(
+            self.data_manager.children_report(), "json")
+        self.assertEqual("[]\n", output)
+
+    def test_jsonl(self):
+        output = self._serialize(
+            self.data_manager.oldest_account_report(), "jsonl")
+        expected_output = ('{"firstname": "Justin", '
+                           '"email": "opoole@example.org", '
+                           '"created_at": "2022-11-25 02:19:37"}\n')
+        self.assertEqual(expected_output, output)
+
+    def test_csv(self):
+        output = self._serialize(
+            self.data_manager.children_by_age_report(), "csv")
+        expected_output = "age,count\n8,1\n14,2\n17,2\n"
+        self.assertEqual(expected_output, output)
+
+    def test_similar_aged_children_csv(self):
+        output = self._serialize(
+            self.data_manager.similar_aged_children_report(), "csv")
+        expected_output = ("parent_firstname,parent_telephone_number,"
+                           "name,age\n"
+                           "Patricia,823816375,Angela,14\n"
+                           "Patricia,823816375,Michael,17\n")
+        self.assertEqual(expected_output, output)
+
+    def test_accounts_csv(self):
+        output = self._serialize(
+            self.data_manager.accounts_report(), "csv")
+        self.assertEqual("accounts\n2\n", output)
+
+    def test_streaming_report_rows(self):
+        """
+        Rows of reports are fetched from the cursor as they are consumed,
+        not buffered in the result (as by ORM-enabled execution).
+        """
+        reports = [self.data_manager.accounts_report,
+                   self.data_manager.oldest_account_report,
+                   self.data_manager.children_by_age_report,
+                   self.data_manager.children_report,
+                   self.data_manager.similar_aged_children_report]
+        for report in reports:
+            with self.subTest(report=report.__name__):
+                self.assertIsInstance(report(), CursorResult)
+
+    def test_unknown_format(self):
+        self.assertRaises(ValueError, self._serialize,
+                          self.data_manager.accounts_report(), "xml")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
 import unittest
-from utils.validators import validate_email, validate_telephone_number
+
+from utils.validators import validate_email, validate_telephone_number, \
+    is_valid_email, is_valid_telephone_number
 from utils.exceptions import InvalidEmailError, InvalidPhoneNumberError
 
 
@@ -148,5 +150,19 @@ class ValidateTelephoneNumberTestCase(unittest.TestCase):
         self.assertTrue(validate_telephone_number(phone_num))
 
 
+class BooleanValidatorsTestCase(unittest.TestCase):
+    def test_valid_email(self):
+        self.assertTrue(is_valid_email("user@domain.org.pl"))
+
+    def test_invalid_email(self):
+        self.assertFalse(is_valid_email("user@@domain.com"))
+
+    def test_valid_telephone_number(self):
+        self.assertTrue(is_valid_telephone_number("123456789"))
+
+    def test_invalid_telephone_number(self):
+        self.assertFalse(is_valid_telephone_number("+48123456789"))
+
+
 if __name__ == '__main__':
     unittest.main()
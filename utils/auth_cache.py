@@ -0,0 +1,74 @@
+import time
+from collections import OrderedDict
+
+from utils.security import check_password_hash
+
+
+class CachedCredentials:
+    """
+    Credentials of an authenticated user, substituting the User object
+    on logging-in from the cache.
+    """
+    __slots__ = ("email", "telephone_number", "password_hash", "role_name")
+
+    def __init__(self, email, telephone_number, password_hash, role_name):
+        self.email = email
+        self.telephone_number = telephone_number
+        self.password_hash = password_hash
+        self.role_name = role_name
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.email, user.telephone_number, user.password_hash,
+                   user.role_name)
+
+    def verify_password(self, password):
+        return check_password_hash(self.password_hash, password)
+
+
+class AuthenticationCache:
+    """
+    Cache of users' credentials keyed by login (email or telephone
+    number), with entries evicted after 'ttl' seconds or when the cache
+    exceeds 'max_size' entries (least recently used first).
+    """
+
+    def __init__(self, max_size=1024, ttl=300, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        # login -> (credentials, expiration time)
+        self._entries = OrderedDict()
+
+    def get(self, login):
+        """
+        :return: CachedCredentials or None
+        """
+        entry = self._entries.get(login)
+        if entry is None:
+            return None
+        credentials, expires_at = entry
+        if expires_at <= self.clock():
+            del self._entries[login]
+            return None
+        self._entries.move_to_end(login)
+        return credentials
+
+    def put(self, login, credentials):
+        self._entries[login] = (credentials, self.clock() + self.ttl)
+        self._entries.move_to_end(login)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, email, telephone_number):
+        """
+        Remove user's credentials cached under both possible logins.
+        """
+        self._entries.pop(email, None)
+        self._entries.pop(telephone_number, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -43,3 +43,11 @@ class AuthorizationError(CredentialsError):
     def __init__(self, msg="Insufficient credentials to perform this action",
                  *args, **kwargs):
         super().__init__(msg, *args, **kwargs)
+
+
+class QueryServerError(Exception):
+    """
+    Exception to be raised by the query server client when the server
+    fails to execute a task.
+    """
+    pass
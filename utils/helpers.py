@@ -1,4 +1,7 @@
 import os
+import re
+from hashlib import sha256
+from itertools import islice
 from os.path import join
 
 
@@ -16,7 +19,13 @@ def clean_telephone_num(telephone_num):
     return filter(str.isdigit, telephone_num)
 
 
+NON_DIGITS_PATTERN = re.compile(r"[^0-9]")
+
+
 def normalize_telephone_num(telephone_num):
+    if telephone_num.isascii():
+        # fast path
+        return NON_DIGITS_PATTERN.sub("", telephone_num)[-9:]
     cleaned_num = clean_telephone_num(telephone_num)
     return convert_filter_to_str(cleaned_num)[-9:]
 
@@ -26,6 +35,17 @@ def get_file_extension(path):
     return file_extension
 
 
+def get_file_hash(path, chunk_size=1024 * 1024):
+    """
+    :return: sha256 hex digest of the file content.
+    """
+    file_hash = sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
 def list_files_for_import(path, file_extensions):
     """
     Find files with given extensions within directory.
@@ -40,3 +60,12 @@ def list_files_for_import(path, file_extensions):
             if get_file_extension(file) in file_extensions:
                 found_files.append(join(root, file))
     return found_files
+
+
+def chunked(iterable, size):
+    """
+    Split an iterable into lists of at most 'size' elements.
+    """
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
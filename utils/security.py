@@ -24,7 +24,7 @@ def login_required(func):
 
 def admin_required(func):
     def _decorator(self, *args, **kwargs):
-        if self._authenticated_user.role.name == ADMIN_ROLE_NAME:
+        if self._authenticated_user.role_name == ADMIN_ROLE_NAME:
             return func(self, *args, **kwargs)
         raise AuthorizationError
 
@@ -7,14 +7,25 @@ email_regex = (r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\."
 
 telephone_num_regex = r"\b\d{9}\b"
 
+EMAIL_PATTERN = re.compile(email_regex)
+TELEPHONE_NUM_PATTERN = re.compile(telephone_num_regex)
+
+
+def is_valid_email(email_address):
+    return EMAIL_PATTERN.fullmatch(email_address) is not None
+
+
+def is_valid_telephone_number(telephone_num):
+    return TELEPHONE_NUM_PATTERN.fullmatch(telephone_num) is not None
+
 
 def validate_email(email_address):
-    if re.fullmatch(email_regex, email_address):
+    if is_valid_email(email_address):
         return True
     raise InvalidEmailError
 
 
 def validate_telephone_number(telephone_num):
-    if re.fullmatch(telephone_num_regex, telephone_num):
+    if is_valid_telephone_number(telephone_num):
         return True
     raise InvalidPhoneNumberError